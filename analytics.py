@@ -0,0 +1,175 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+from helpers.metrics import metrics
+
+# Game id type digit -> when that kind of game is played within a season. Play-in (5) comes
+# before the playoffs (4), and the NBA Cup final (6) falls within the regular season.
+GAME_TYPE_ORDER = {"1": 0, "2": 1, "6": 1, "3": 2, "5": 3, "4": 4}
+
+
+def game_order(game_id, game_date=None) -> tuple:
+    """Chronological sort key for a game: its date when known, then season, game type and id."""
+    gid = str(game_id).zfill(10)
+    return (str(game_date)[:10] if game_date is not None else "", gid[3:5],
+            GAME_TYPE_ORDER.get(gid[2], 1), gid)
+
+
+def _season_label(season_digits) -> str:
+    """'24' (game id digits 4-5) -> '2024-25'."""
+    return f"20{season_digits}-{(int(season_digits) + 1) % 100:02d}"
+
+
+class _PlayerState:
+    """Running sums for one player, plus the trailing-window games as (order, fp, minutes)."""
+    __slots__ = ("games", "sum_fp", "sumsq_fp", "sum_min", "recent", "window_sums")
+
+    def __init__(self, windows):
+        self.games = 0
+        self.sum_fp = 0.0
+        self.sumsq_fp = 0.0
+        self.sum_min = 0.0
+        self.recent = deque(maxlen=max(windows)) if windows else deque(maxlen=0)
+        self.window_sums = {w: [0.0, 0.0] for w in windows}  # [fp, minutes] over the last w games
+
+
+class RollingAnalytics:
+    """
+    Incremental fantasy analytics over player_per_game_stats rows: avg_fp, fp_per_min,
+    consistency (CV), trailing-window averages and league-wide z-scores.
+    Each new game updates its player's sums in O(1) (O(#windows) for the trailing windows);
+    summary() derives every metric from those sums without rescanning raw rows.
+    Games with zero minutes (DNPs) are not counted. A game that arrives after a later one of
+    the same player is slotted into its place in the trailing windows. Metrics cover one
+    season: the first game of a newer season starts every player over, and games from an
+    older season are skipped (and counted), so only the current season's (player_id, game_id)
+    pairs are remembered for replay detection.
+    """
+
+    def __init__(self, windows=(5, 10, 20), fp_col="fantasy_points"):
+        self.windows = tuple(sorted(windows))
+        self.fp_col = fp_col
+        self.players = {}
+        self._season = None  # newest season applied (game id digits 4-5)
+        self._seen = set()  # (player_id, game_id) of that season already applied, so replays are no-ops
+        self.skipped_old_season = 0  # rows from an older season than self._season
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, windows=(5, 10, 20), fp_col="fantasy_points"):
+        """Build the engine from a season of per-game rows (applied in date, then game id order)."""
+        engine = cls(windows=windows, fp_col=fp_col)
+        engine.add_games(df)
+        return engine
+
+    def add_game(self, player_id, game_id, fantasy_points, minutes, game_date=None):
+        key = (int(player_id), str(game_id).zfill(10))
+        season = key[1][3:5]
+        if self._season is not None and season < self._season:
+            self.skipped_old_season += 1
+            metrics.count("analytics.skipped_old_season")
+            return False
+        if season != self._season:
+            if self._season is not None:
+                print(f"[ANALYTICS] {_season_label(season)} started; resetting {len(self.players)} players")
+            self._season = season
+            self._seen = set()
+            self.players = {}
+        if key in self._seen or not minutes > 0:
+            return False
+        self._seen.add(key)
+        order = game_order(key[1], game_date)
+
+        state = self.players.get(key[0])
+        if state is None:
+            state = self.players[key[0]] = _PlayerState(self.windows)
+
+        fp = float(fantasy_points)
+        minutes = float(minutes)
+        state.games += 1
+        state.sum_fp += fp
+        state.sumsq_fp += fp * fp
+        state.sum_min += minutes
+
+        if state.recent and order < state.recent[-1][0]:
+            # A late-arriving older game: put it in its place and re-sum the windows, O(max window)
+            recent = sorted([*state.recent, (order, fp, minutes)])
+            state.recent = deque(recent[-state.recent.maxlen:], maxlen=state.recent.maxlen)
+            for w, sums in state.window_sums.items():
+                window = list(state.recent)[-w:]
+                sums[0] = sum(g[1] for g in window)
+                sums[1] = sum(g[2] for g in window)
+            return True
+
+        # Each window drops the game that just fell out of it (the w-th most recent before this one)
+        for w, sums in state.window_sums.items():
+            if len(state.recent) >= w:
+                _, old_fp, old_min = state.recent[-w]
+                sums[0] -= old_fp
+                sums[1] -= old_min
+            sums[0] += fp
+            sums[1] += minutes
+        state.recent.append((order, fp, minutes))
+        return True
+
+    def add_games(self, df: pd.DataFrame):
+        """Apply a batch of per-game rows (e.g. one night's slate) in chronological order, by
+        game_date when the frame has it; returns how many were new."""
+        dates = df["game_date"] if "game_date" in df.columns else pd.Series(None, index=df.index)
+        order = [game_order(gid, d if pd.notna(d) else None) for gid, d in zip(df["game_id"], dates)]
+        perm = sorted(range(len(df)), key=order.__getitem__)
+        ordered, dates = df.iloc[perm], dates.iloc[perm]
+        added, skipped = 0, self.skipped_old_season
+        for pid, gid, fp, minutes, d in zip(ordered["player_id"], ordered["game_id"], ordered[self.fp_col],
+                                            ordered["minutes"], dates):
+            added += self.add_game(pid, gid, fp, minutes, d if pd.notna(d) else None)
+        if self.skipped_old_season > skipped:
+            print(f"[ANALYTICS] Skipped {self.skipped_old_season - skipped} rows from seasons "
+                  f"before {_season_label(self._season)}; metrics cover one season")
+        return added
+
+    def summary(self, min_games=1) -> pd.DataFrame:
+        """One row per player with every metric; z-scores are over players with >= min_games."""
+        if not self.players:
+            return pd.DataFrame(columns=["player_id", "games", "avg_fp", "fp_per_min", "std_fp", "cv"])
+
+        ids = np.fromiter(self.players, dtype=np.int64, count=len(self.players))
+        states = list(self.players.values())
+        games = np.array([s.games for s in states], dtype=float)
+        sum_fp = np.array([s.sum_fp for s in states])
+        sumsq_fp = np.array([s.sumsq_fp for s in states])
+        sum_min = np.array([s.sum_min for s in states])
+
+        avg_fp = sum_fp / games
+        with np.errstate(divide="ignore", invalid="ignore"):
+            variance = np.where(games > 1, (sumsq_fp - games * avg_fp ** 2) / (games - 1), np.nan)
+            std_fp = np.sqrt(np.clip(variance, 0, None))
+            cv = std_fp / avg_fp
+
+        out = pd.DataFrame({
+            "player_id": ids,
+            "games": games.astype(int),
+            "avg_fp": avg_fp,
+            "fp_per_min": sum_fp / sum_min,
+            "std_fp": std_fp,
+            "cv": cv,
+        })
+
+        for w in self.windows:
+            n = np.minimum(games, w)
+            out[f"last{w}_avg_fp"] = np.array([s.window_sums[w][0] for s in states]) / n
+            out[f"last{w}_fp_per_min"] = (np.array([s.window_sums[w][0] for s in states])
+                                          / np.array([s.window_sums[w][1] for s in states]))
+
+        pool = out["games"] >= min_games
+        for col in ["avg_fp", "fp_per_min"] + [f"last{w}_avg_fp" for w in self.windows]:
+            mean, std = out.loc[pool, col].mean(), out.loc[pool, col].std()
+            out[f"z_{col}"] = (out[col] - mean) / std if std else 0.0
+
+        return out
+
+    def breakouts(self, window=5, min_games=10, top=25) -> pd.DataFrame:
+        """Players whose trailing-window average most exceeds their season average, in z-score terms."""
+        summary = self.summary(min_games=min_games)
+        summary = summary[summary["games"] >= min_games].copy()
+        summary["breakout_score"] = summary[f"z_last{window}_avg_fp"] - summary["z_avg_fp"]
+        return summary.sort_values("breakout_score", ascending=False).head(top)
@@ -0,0 +1,161 @@
+"""
+Multi-season backfill.
+
+    python backfill.py 2015-16 2024-25                # every season in the range
+    python backfill.py 2019-20 --processes 8 --no-load
+
+Every season gets its own shard under backfill/<season>/ (games.csv, fetch_manifest.db,
+player_game_store/, plus the transform outputs season_totals.parquet and
+player_summary.parquet), so seasons never contend for one cache index and any season can
+be rebuilt by deleting its directory. Raw responses stay in raw_cache/<season>/.
+
+Fetching runs in threads (--fetch-seasons seasons at a time), all charged to a single
+RateLimiter, so the request budget is global however many seasons run at once. As soon as a season's
+fetch finishes, its transform and scoring (season totals, per-player analytics) runs in a
+process pool, overlapping with the fetches still going; results are loaded from the main
+process. Already-fetched seasons cost no requests, so a re-run scales with cores.
+"""
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from helpers.metrics import metrics
+
+BACKFILL_DIR = "backfill"
+
+
+def season_range(first: str, last: str = None) -> list:
+    """['2022-23', '2023-24', '2024-25'] from '2022-23' and '2024-25' (inclusive)."""
+    start, end = int(first[:4]), int((last or first)[:4])
+    return [f"{year}-{(year + 1) % 100:02d}" for year in range(start, end + 1)]
+
+
+def season_dir(season, root=BACKFILL_DIR) -> str:
+    return os.path.join(root, season)
+
+
+def fetch_season(season, root, rate_limiter, max_workers=4) -> int:
+    """Network stage (runs in a thread): the season's games and per-game rows into its shard."""
+    from config import CURRENT_SEASON
+    from extract import extract_games_by_season, extract_player_game_stats_bulk
+    from helpers.manifest import FetchManifest
+    from helpers.store import SeasonStore
+
+    shard = season_dir(season, root)
+    os.makedirs(shard, exist_ok=True)
+    # The season in progress gains games every night; finished seasons are read from the shard
+    games_df = extract_games_by_season(season, cache_file=os.path.join(shard, "games.csv"),
+                                       refresh=season == CURRENT_SEASON, rate_limiter=rate_limiter)
+    if games_df.empty:
+        return 0
+    store = SeasonStore(os.path.join(shard, "player_game_store"))
+    manifest = FetchManifest(os.path.join(shard, "fetch_manifest.db"))
+    # The shard's own (normally absent) CSV cache: the global one holds every season
+    extract_player_game_stats_bulk(games_df, season=season, store=store, manifest=manifest,
+                                   max_workers=max_workers, rate_limiter=rate_limiter,
+                                   cache_dir=os.path.join(shard, "player_game_cache"))
+    return games_df["game_id"].nunique()
+
+
+def transform_season(season, root) -> dict:
+    """CPU stage (runs in a worker process): season totals and player analytics from the stored games."""
+    from analytics import RollingAnalytics
+    from helpers.store import SeasonStore
+    from transform import season_totals_from_games
+
+    shard = season_dir(season, root)
+    per_game = SeasonStore(os.path.join(shard, "player_game_store")).read(season=season)
+    if per_game.empty:
+        return {"season": season, "rows": 0}
+
+    totals = season_totals_from_games(per_game, season)
+    summary = RollingAnalytics.from_frame(per_game).summary(min_games=10)
+    summary.insert(1, "season", season)
+    for name, df in (("season_totals", totals), ("player_summary", summary)):
+        tmp_file = os.path.join(shard, f"{name}.parquet.tmp")
+        df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, os.path.join(shard, f"{name}.parquet"))
+    return {"season": season, "rows": len(per_game), "players": len(totals)}
+
+
+def load_season(season, root):
+    """Load one transformed season (main process, one season at a time)."""
+    import pandas as pd
+    from helpers.season_totals import SeasonTotals
+    from helpers.store import SeasonStore
+    from load import load_table
+
+    shard = season_dir(season, root)
+    store = SeasonStore(os.path.join(shard, "player_game_store"))
+    load_table(pd.read_csv(os.path.join(shard, "games.csv"), dtype={"game_id": str, "season_id": str}),
+               "games", bulk=True)
+    load_table(store.read(season=season), "player_per_game_stats", delta=True)
+    load_table(pd.read_parquet(os.path.join(shard, "season_totals.parquet")), "player_game_stats", bulk=True)
+    # Seed the running totals, so live.py's nightly deltas start from the full season
+    SeasonTotals().rebuild(store, season)
+
+
+def backfill(seasons, root=BACKFILL_DIR, processes=None, fetch_seasons=2, max_workers=4,
+             requests_per_second=1.0, load=True) -> list:
+    """
+    Fetch, transform and (optionally) load every season; returns one summary dict per season.
+    fetch_seasons seasons are fetched at a time, each with up to max_workers box-score
+    threads, all sharing one requests_per_second budget.
+    """
+    from helpers.ratelimit import RateLimiter
+
+    rate_limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+    results = []
+    # spawn: worker processes must not inherit the fetch threads' locks
+    with ThreadPoolExecutor(max_workers=fetch_seasons) as fetchers, \
+            ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = {fetchers.submit(fetch_season, season, root, rate_limiter, max_workers): ("fetch", season)
+                   for season in seasons}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, season = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"[BACKFILL] {season}: {stage} failed: {e}")
+                    metrics.count("backfill.failed_seasons")
+                    continue
+
+                if stage == "fetch":
+                    print(f"[BACKFILL] {season}: fetched {result} games, transforming")
+                    pending[pool.submit(transform_season, season, root)] = ("transform", season)
+                    continue
+
+                print(f"[BACKFILL] {season}: {result['rows']} player-game rows transformed")
+                if load and result["rows"]:
+                    try:
+                        load_season(season, root)
+                    except Exception as e:
+                        print(f"[BACKFILL] {season}: load failed: {e}")
+                        metrics.count("backfill.failed_seasons")
+                        continue
+                results.append(result)
+    return sorted(results, key=lambda r: r["season"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("first", help="first season, e.g. 2015-16")
+    parser.add_argument("last", nargs="?", help="last season (default: just the first)")
+    parser.add_argument("--processes", type=int, help="transform processes (default: one per core)")
+    parser.add_argument("--fetch-seasons", type=int, default=2, help="seasons fetched at the same time")
+    parser.add_argument("--requests-per-second", type=float, default=1.0, help="global API budget")
+    parser.add_argument("--dir", default=BACKFILL_DIR, help="root of the per-season shards")
+    parser.add_argument("--no-load", action="store_true", help="fetch and transform only")
+    args = parser.parse_args(argv)
+
+    seasons = season_range(args.first, args.last)
+    results = backfill(seasons, root=args.dir, processes=args.processes, fetch_seasons=args.fetch_seasons,
+                       requests_per_second=args.requests_per_second, load=not args.no_load)
+    print(f"✅ Backfilled {len(results)}/{len(seasons)} seasons")
+    metrics.export()
+
+
+if __name__ == "__main__":
+    main()
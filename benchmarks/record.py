@@ -0,0 +1,43 @@
+"""
+Record real NBA API payloads for the benchmark stub to replay.
+
+    python -m benchmarks.record --games 0022400077 0022400078 --dates 2024-10-25 --players 2544
+
+Needs the real nba_api and network access; files land in benchmarks/payloads/<Endpoint>/<key>.json.
+"""
+import argparse
+import json
+import os
+from nba_api.stats.endpoints import boxscoretraditionalv2, scoreboardv2, CommonPlayerInfo, leaguedashplayerstats
+from benchmarks.stub_nba_api import PAYLOAD_DIR
+
+
+def save(endpoint, key, payload):
+    os.makedirs(os.path.join(PAYLOAD_DIR, endpoint), exist_ok=True)
+    with open(os.path.join(PAYLOAD_DIR, endpoint, f"{key}.json"), "w") as f:
+        json.dump(payload, f)
+    print(f"Recorded {endpoint} {key}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--games", nargs="*", default=[])
+    parser.add_argument("--dates", nargs="*", default=[])
+    parser.add_argument("--players", nargs="*", default=[])
+    parser.add_argument("--seasons", nargs="*", default=[])
+    args = parser.parse_args()
+
+    for game_id in args.games:
+        save("BoxScoreTraditionalV2", game_id,
+             boxscoretraditionalv2.BoxScoreTraditionalV2(game_id=game_id, timeout=60).get_dict())
+    for game_date in args.dates:
+        save("ScoreboardV2", game_date, scoreboardv2.ScoreboardV2(game_date=game_date).get_dict())
+    for player_id in args.players:
+        save("CommonPlayerInfo", player_id, CommonPlayerInfo(player_id=player_id).get_dict())
+    for season in args.seasons:
+        save("LeagueDashPlayerStats", season,
+             leaguedashplayerstats.LeagueDashPlayerStats(season=season).get_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Offline benchmarks for the extract / transform / load stages.
+
+    python -m benchmarks.run                          # 1, 5 and 20 seasons, no network
+    python -m benchmarks.run --latency 0.05 --error-rate 0.02 --fetch-games 300
+    python -m benchmarks.run --pg-url postgresql://localhost/nba_bench
+    python -m benchmarks.run --compare bench_results_old.json
+
+The NBA API is replaced by benchmarks.stub_nba_api; the load stage only runs when a
+local Postgres URL is given. Results are written as JSON (one record per stage and scale)
+so two runs can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+from benchmarks import stub_nba_api, synthetic
+
+SCALES = [1, 5, 20]
+
+
+def _ensure_config():
+    """load.py imports config.engine; benchmarks shouldn't need a real config.py."""
+    try:
+        import config  # noqa: F401
+    except ImportError:
+        sys.modules["config"] = types.SimpleNamespace(engine=None, CURRENT_SEASON="2024-25")
+
+
+def _record(results, stage, seasons, rows, seconds, unit="rows"):
+    results.append({
+        "stage": stage,
+        "seasons": seasons,
+        unit: rows,
+        "seconds": round(seconds, 4),
+        f"{unit}_per_s": round(rows / seconds, 1) if seconds else None,
+    })
+    print(f"{stage:<22} seasons={seasons:<3} {unit}={rows:<9} {seconds:8.3f}s  {rows / seconds if seconds else 0:12.1f} {unit}/s")
+
+
+def bench_fetch(results, n_games, max_workers, requests_per_second):
+    from extract import extract_player_game_stats_for_season
+    from helpers.manifest import FetchManifest
+    from helpers.store import SeasonStore
+    from helpers import transport
+
+    with tempfile.TemporaryDirectory() as tmp:
+        transport.RAW_CACHE_DIR = os.path.join(tmp, "raw_cache")  # measure fetching, not replays
+        game_ids = synthetic.season_game_ids(2024, n_games)
+        store = SeasonStore(os.path.join(tmp, "store"))
+        manifest = FetchManifest(os.path.join(tmp, "manifest.db"))
+        start = time.perf_counter()
+        extract_player_game_stats_for_season(
+            game_ids, cache_dir=os.path.join(tmp, "csv"), max_workers=max_workers,
+            requests_per_second=requests_per_second, store=store, manifest=manifest)
+        _record(results, "fetch", 1, n_games, time.perf_counter() - start, unit="games")
+
+
+def bench_transform(results, seasons):
+    from transform import normalize_season_player_game_stats, compute_fantasy_points
+    from helpers.calculateFantasyPoints import score_rulesets
+
+    raw = synthetic.box_score_frame(seasons * synthetic.GAMES_PER_SEASON, seed=seasons)
+
+    start = time.perf_counter()
+    normalized = normalize_season_player_game_stats([raw])
+    _record(results, "normalize", seasons, len(raw), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    compute_fantasy_points(normalized)
+    _record(results, "compute_fantasy_points", seasons, len(normalized), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    score_rulesets(normalized)
+    _record(results, "score_all_leagues", seasons, len(normalized), time.perf_counter() - start)
+    return normalized
+
+
+def bench_load(results, seasons, df, pg_url):
+    from sqlalchemy import create_engine, text
+    import load
+
+    table = "player_per_game_stats_bench"
+    load.engine = create_engine(pg_url)
+    df.head(0).to_sql(table, load.engine, if_exists="replace", index=False)
+    with load.engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (player_id, game_id)"))
+
+    start = time.perf_counter()
+    load.copy_load(df, table, conflict_cols=["player_id", "game_id"])
+    _record(results, "load_copy", seasons, len(df), time.perf_counter() - start)
+
+
+def compare(results, baseline_file, tolerance=0.10):
+    """Print per-stage throughput change against an earlier results file."""
+    with open(baseline_file, "r") as f:
+        baseline = {(r["stage"], r["seasons"]): r for r in json.load(f)["results"]}
+
+    print(f"\nCompared with {baseline_file}:")
+    regressions = 0
+    for r in results:
+        old = baseline.get((r["stage"], r["seasons"]))
+        rate_key = next(k for k in r if k.endswith("_per_s"))
+        if not old or not old.get(rate_key) or not r[rate_key]:
+            continue
+        change = r[rate_key] / old[rate_key] - 1
+        flag = "REGRESSION" if change < -tolerance else ""
+        regressions += bool(flag)
+        print(f"{r['stage']:<22} seasons={r['seasons']:<3} {change:+7.1%} {flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, nargs="*", default=SCALES)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every stub API call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability a stub API call fails")
+    parser.add_argument("--fetch-games", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--requests-per-second", type=float, default=1000.0)
+    parser.add_argument("--pg-url", help="local Postgres URL for the load stage (skipped if omitted)")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    stub_nba_api.install(latency=args.latency, error_rate=args.error_rate)
+    _ensure_config()
+
+    results = []
+    bench_fetch(results, args.fetch_games, args.max_workers, args.requests_per_second)
+    for seasons in args.seasons:
+        normalized = bench_transform(results, seasons)
+        if args.pg_url:
+            bench_load(results, seasons, normalized, args.pg_url)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "latency": args.latency,
+            "error_rate": args.error_rate,
+            "api_calls": dict(stub_nba_api.calls),
+        },
+        "results": results,
+    }
+    # Compare before writing, in case --output and --compare name the same file
+    regressions = compare(results, args.compare) if args.compare else 0
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
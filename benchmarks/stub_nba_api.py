@@ -0,0 +1,134 @@
+"""
+Local stand-in for the nba_api endpoints the pipeline uses.
+
+install() registers fake `nba_api.stats.endpoints` / `nba_api.stats.static` modules in
+sys.modules, so it must run before extract/transform are imported. Payloads come from
+recorded JSON files under benchmarks/payloads/<Endpoint>/<key>.json when present
+(see benchmarks/record.py) and are synthesized otherwise. Every call sleeps `latency`
+seconds and fails with probability `error_rate`, like a throttled API would.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+import types
+import pandas as pd
+from benchmarks import synthetic
+
+PAYLOAD_DIR = os.path.join(os.path.dirname(__file__), "payloads")
+
+settings = {"latency": 0.0, "error_rate": 0.0}
+calls = {}
+_calls_lock = threading.Lock()
+
+
+def _payload(endpoint, key, synthesize):
+    recorded = os.path.join(PAYLOAD_DIR, endpoint, f"{key}.json")
+    if os.path.exists(recorded):
+        with open(recorded, "r") as f:
+            return json.load(f)
+    return synthesize(key)
+
+
+class _Endpoint:
+    endpoint = None
+
+    def __init__(self, key, synthesize):
+        with _calls_lock:
+            calls[self.endpoint] = calls.get(self.endpoint, 0) + 1
+        time.sleep(settings["latency"])
+        if random.random() < settings["error_rate"]:
+            raise ConnectionError("429 Client Error: Too Many Requests (injected)")
+        self.payload = _payload(self.endpoint, key, synthesize)
+
+    def get_dict(self):
+        return self.payload
+
+    def get_data_frames(self):
+        return [pd.DataFrame(rs["rowSet"], columns=rs["headers"]) for rs in self.payload["resultSets"]]
+
+    def get_normalized_dict(self):
+        return {rs["name"]: [dict(zip(rs["headers"], row)) for row in rs["rowSet"]]
+                for rs in self.payload["resultSets"]}
+
+
+class BoxScoreTraditionalV2(_Endpoint):
+    endpoint = "BoxScoreTraditionalV2"
+
+    def __init__(self, game_id, timeout=30, **kwargs):
+        super().__init__(game_id, synthetic.box_score_payload)
+
+
+class ScoreboardV2(_Endpoint):
+    endpoint = "ScoreboardV2"
+
+    def __init__(self, game_date, timeout=30, **kwargs):
+        super().__init__(game_date, synthetic.scoreboard_payload)
+
+
+class CommonPlayerInfo(_Endpoint):
+    endpoint = "CommonPlayerInfo"
+
+    def __init__(self, player_id, timeout=30, **kwargs):
+        super().__init__(str(player_id), synthetic.common_player_info_payload)
+
+
+class LeagueDashPlayerStats(_Endpoint):
+    endpoint = "LeagueDashPlayerStats"
+
+    def __init__(self, season, timeout=30, **kwargs):
+        super().__init__(season, synthetic.league_dash_payload)
+
+
+class LeagueGameLog(_Endpoint):
+    endpoint = "LeagueGameLog"
+
+    def __init__(self, season, season_type_all_star="Regular Season", player_or_team_abbreviation="T",
+                 timeout=30, **kwargs):
+        super().__init__(season, synthetic.league_game_log_payload)
+
+
+class PlayerGameLogs(_Endpoint):
+    endpoint = "PlayerGameLogs"
+
+    def __init__(self, season_nullable, date_from_nullable="", date_to_nullable="", timeout=30, **kwargs):
+        super().__init__(f"{season_nullable}|{date_from_nullable}|{date_to_nullable}",
+                         synthetic.player_game_logs_payload)
+
+
+def _static_players():
+    return [{"id": synthetic.player_id(t, s), "full_name": f"Player {s}", "is_active": True}
+            for t in synthetic.TEAM_IDS for s in range(synthetic.PLAYERS_PER_TEAM)]
+
+
+def _static_teams():
+    return [{"id": t, "full_name": f"Team {t}", "abbreviation": "TST"} for t in synthetic.TEAM_IDS]
+
+
+def install(latency=0.0, error_rate=0.0):
+    """Register the stub modules (replacing any real nba_api) and set latency / error injection."""
+    settings.update(latency=latency, error_rate=error_rate)
+
+    endpoints = types.ModuleType("nba_api.stats.endpoints")
+    for cls in (BoxScoreTraditionalV2, ScoreboardV2, CommonPlayerInfo, LeagueDashPlayerStats, LeagueGameLog,
+                PlayerGameLogs):
+        setattr(endpoints, cls.__name__, cls)
+    # extract.py imports the endpoint modules by their lowercase names
+    endpoints.boxscoretraditionalv2 = types.SimpleNamespace(BoxScoreTraditionalV2=BoxScoreTraditionalV2)
+    endpoints.scoreboardv2 = types.SimpleNamespace(ScoreboardV2=ScoreboardV2)
+    endpoints.leaguedashplayerstats = types.SimpleNamespace(LeagueDashPlayerStats=LeagueDashPlayerStats)
+    endpoints.leaguegamelog = types.SimpleNamespace(LeagueGameLog=LeagueGameLog)
+    endpoints.playergamelogs = types.SimpleNamespace(PlayerGameLogs=PlayerGameLogs)
+
+    static = types.ModuleType("nba_api.stats.static")
+    static.players = types.SimpleNamespace(get_active_players=_static_players)
+    static.teams = types.SimpleNamespace(get_teams=_static_teams)
+
+    root, stats = types.ModuleType("nba_api"), types.ModuleType("nba_api.stats")
+    root.stats, stats.endpoints, stats.static = stats, endpoints, static
+    sys.modules.update({
+        "nba_api": root, "nba_api.stats": stats,
+        "nba_api.stats.endpoints": endpoints, "nba_api.stats.static": static,
+    })
@@ -0,0 +1,180 @@
+"""Synthetic NBA API payloads in the same resultSets shape the real endpoints return."""
+import zlib
+import numpy as np
+
+BOX_SCORE_HEADERS = [
+    "GAME_ID", "TEAM_ID", "TEAM_ABBREVIATION", "TEAM_CITY", "PLAYER_ID", "PLAYER_NAME", "NICKNAME",
+    "START_POSITION", "COMMENT", "MIN", "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA",
+    "FT_PCT", "OREB", "DREB", "REB", "AST", "STL", "BLK", "TO", "PF", "PTS", "PLUS_MINUS",
+]
+GAME_HEADER_HEADERS = ["GAME_DATE_EST", "GAME_SEQUENCE", "GAME_ID", "GAME_STATUS_ID", "GAME_STATUS_TEXT",
+                       "GAMECODE", "HOME_TEAM_ID", "VISITOR_TEAM_ID", "SEASON"]
+
+TEAM_IDS = list(range(1610612737, 1610612767))
+PLAYERS_PER_TEAM = 13
+GAMES_PER_SEASON = 1230
+
+
+def season_game_ids(season_start: int, n_games=GAMES_PER_SEASON):
+    """Regular-season game ids for a season, e.g. 2024 -> 0022400001..."""
+    return [f"002{season_start % 100:02d}{i:05d}" for i in range(1, n_games + 1)]
+
+
+def player_id(team_id, slot):
+    return 1620000 + (team_id - TEAM_IDS[0]) * 100 + slot
+
+
+def _team_seconds(rng, players=11, game_seconds=48 * 60 * 5):
+    """Seconds played by each of a team's players, adding up to a full regulation game."""
+    weights = rng.integers(4, 42, players)
+    seconds = weights * game_seconds // weights.sum()
+    seconds[0] += game_seconds - seconds.sum()
+    return [int(x) for x in seconds]
+
+
+def box_score_payload(game_id: str) -> dict:
+    """Deterministic BoxScoreTraditionalV2 payload for a game id."""
+    rng = np.random.default_rng(int(game_id))
+    home, away = rng.choice(TEAM_IDS, size=2, replace=False)
+    rows = []
+    for team_id in (int(home), int(away)):
+        seconds = _team_seconds(rng)
+        for slot in range(PLAYERS_PER_TEAM):
+            dnp = slot >= 11
+            fga = 0 if dnp else int(rng.integers(0, 22))
+            fgm = int(rng.integers(0, fga + 1)) if fga else 0
+            fg3a = int(rng.integers(0, fga + 1)) if fga else 0
+            fg3m = min(int(rng.integers(0, fg3a + 1)) if fg3a else 0, fgm)
+            fta = 0 if dnp else int(rng.integers(0, 10))
+            ftm = int(rng.integers(0, fta + 1)) if fta else 0
+            oreb, dreb, ast, stl, blk, tov, pf = (0,) * 7 if dnp else tuple(int(x) for x in rng.integers(0, [5, 12, 12, 4, 4, 6, 6]))
+            pts = 2 * fgm + fg3m + ftm
+            rows.append([
+                game_id, team_id, "TST", "Test", player_id(team_id, slot), f"Player {slot}", "P", "",
+                "DNP - Coach's Decision" if dnp else "", None if dnp else f"{seconds[slot] // 60}:{seconds[slot] % 60:02d}",
+                fgm, fga, fgm / fga if fga else 0.0, fg3m, fg3a, fg3m / fg3a if fg3a else 0.0, ftm, fta,
+                ftm / fta if fta else 0.0, oreb, dreb, oreb + dreb, ast, stl, blk, tov, pf, pts,
+                int(rng.integers(-20, 21)),
+            ])
+    return {"resultSets": [{"name": "PlayerStats", "headers": BOX_SCORE_HEADERS, "rowSet": rows}]}
+
+
+def scoreboard_payload(game_date: str, games_per_day=7) -> dict:
+    """ScoreboardV2 GameHeader payload with a handful of games on game_date."""
+    rng = np.random.default_rng(zlib.crc32(game_date.encode()))
+    season = int(game_date[:4]) if int(game_date[5:7]) >= 10 else int(game_date[:4]) - 1
+    rows = []
+    for seq in range(1, games_per_day + 1):
+        home, away = rng.choice(TEAM_IDS, size=2, replace=False)
+        rows.append([f"{game_date}T00:00:00", seq, f"002{season % 100:02d}{int(rng.integers(1, 1231)):05d}", 3,
+                     "Final", "", int(home), int(away), str(season)])
+    return {"resultSets": [{"name": "GameHeader", "headers": GAME_HEADER_HEADERS, "rowSet": rows}]}
+
+
+def game_date(game_id: str) -> str:
+    """Synthetic date for a game id: eight games a day from October 22nd of its season."""
+    season = 2000 + int(game_id[3:5])
+    day = (int(game_id[5:]) - 1) // 8
+    return (np.datetime64(f"{season}-10-22") + np.timedelta64(day, "D")).astype(str)
+
+
+def league_game_log_payload(season: str, n_games=GAMES_PER_SEASON) -> dict:
+    """Team-mode LeagueGameLog payload (one row per team per game) built from the box scores."""
+    headers = ["SEASON_ID", "TEAM_ID", "TEAM_ABBREVIATION", "TEAM_NAME", "GAME_ID", "GAME_DATE",
+               "MATCHUP", "WL", "MIN", "PTS", "PLUS_MINUS", "VIDEO_AVAILABLE"]
+    rows = []
+    for gid in season_game_ids(int(season[:4]), n_games):
+        players = box_score_payload(gid)["resultSets"][0]["rowSet"]
+        team_ids = list(dict.fromkeys(row[1] for row in players))
+        points = {t: sum(row[27] for row in players if row[1] == t) for t in team_ids}
+        for team_id, other in zip(team_ids, team_ids[::-1]):
+            rows.append([f"2{season[:4]}", team_id, "TST", f"Team {team_id}", gid, game_date(gid),
+                         "TST vs. TST" if team_id == team_ids[0] else "TST @ TST",
+                         "W" if points[team_id] > points[other] else "L", 240, points[team_id],
+                         points[team_id] - points[other], 1])
+    return {"resultSets": [{"name": "LeagueGameLog", "headers": headers, "rowSet": rows}]}
+
+
+def player_game_logs_payload(key: str) -> dict:
+    """PlayerGameLogs payload for key 'season|MM/DD/YYYY|MM/DD/YYYY': every player who played
+    in the synthetic games between the two dates, with decimal minutes like the real endpoint."""
+    season, date_from, date_to = key.split("|")
+    date_from, date_to = (f"{d[6:]}-{d[:2]}-{d[3:5]}" for d in (date_from, date_to))
+    headers = ["SEASON_YEAR", "PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "TEAM_ABBREVIATION", "GAME_ID", "GAME_DATE",
+               "MATCHUP", "WL", "MIN", "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA", "FT_PCT",
+               "OREB", "DREB", "REB", "AST", "TOV", "STL", "BLK", "PF", "PTS", "PLUS_MINUS"]
+    rows = []
+    for gid in season_game_ids(int(season[:4])):
+        date = game_date(gid)
+        if not date_from <= date <= date_to:
+            continue
+        for p in box_score_payload(gid)["resultSets"][0]["rowSet"]:
+            if p[9] is None:
+                continue
+            mins, secs = p[9].split(":")
+            rows.append([season, p[4], p[5], p[1], p[2], gid, f"{date}T00:00:00", "TST vs. TST", "W",
+                         int(mins) + int(secs) / 60, *p[10:22], p[22], p[25], p[23], p[24], p[26], p[27], p[28]])
+    return {"resultSets": [{"name": "PlayerGameLogs", "headers": headers, "rowSet": rows}]}
+
+
+def common_player_info_payload(pid) -> dict:
+    rng = np.random.default_rng(int(pid))
+    headers = ["PERSON_ID", "FIRST_NAME", "LAST_NAME", "POSITION", "HEIGHT", "WEIGHT", "TEAM_ID",
+               "TEAM_ABBREVIATION", "DRAFT_YEAR", "DRAFT_ROUND", "DRAFT_NUMBER", "FROM_YEAR", "TO_YEAR"]
+    row = [int(pid), "Test", f"Player{pid}", str(rng.choice(["Guard", "Forward", "Center", "Guard-Forward"])),
+           f"6-{int(rng.integers(0, 12))}", str(int(rng.integers(170, 260))), TEAM_IDS[0], "TST",
+           str(int(rng.integers(2005, 2024))), "1", str(int(rng.integers(1, 31))), 2015, 2024]
+    return {"resultSets": [{"name": "CommonPlayerInfo", "headers": headers, "rowSet": [row]}]}
+
+
+def league_dash_payload(season: str) -> dict:
+    headers = ["PLAYER_ID", "PLAYER_NAME", "TEAM_ID", "GP", "MIN", "PTS", "DREB", "OREB", "REB", "AST",
+               "STL", "BLK", "TOV", "FGA", "FGM", "FG_PCT", "FTA", "FTM", "FT_PCT", "FG3A", "FG3M",
+               "FG3_PCT", "PF", "NBA_FANTASY_PTS"]
+    rng = np.random.default_rng(int(season[:4]))
+    rows = []
+    for team_id in TEAM_IDS:
+        for slot in range(PLAYERS_PER_TEAM):
+            stats = [int(x) for x in rng.integers(0, 1500, 17)]
+            rows.append([player_id(team_id, slot), f"Player {slot}", team_id, 60, 1800.0] + stats[:10]
+                        + [0.45, stats[10], stats[11], 0.8, stats[12], stats[13], 0.36, stats[14], 2000.0])
+    return {"resultSets": [{"name": "LeagueDashPlayerStats", "headers": headers, "rowSet": rows}]}
+
+
+def box_score_frame(n_games: int, seed=0):
+    """Vectorized raw box scores (BoxScoreTraditionalV2 PlayerStats columns) for n_games,
+    for benchmarking transform stages at multi-season scale without building payloads."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    per_game = 2 * PLAYERS_PER_TEAM
+    n = n_games * per_game
+    game_idx = np.repeat(np.arange(n_games), per_game)
+    slot = np.tile(np.arange(per_game), n_games)
+    team_id = np.asarray(TEAM_IDS)[(game_idx * 2 + slot // PLAYERS_PER_TEAM) % len(TEAM_IDS)]
+
+    fga = rng.integers(0, 22, n)
+    fgm = (fga * rng.random(n)).astype(int)
+    fg3a = (fga * rng.random(n)).astype(int)
+    fg3m = np.minimum((fg3a * rng.random(n)).astype(int), fgm)
+    fta = rng.integers(0, 10, n)
+    ftm = (fta * rng.random(n)).astype(int)
+    oreb, dreb = rng.integers(0, 5, n), rng.integers(0, 12, n)
+    minutes = np.char.add(np.char.add(rng.integers(0, 42, n).astype(str), ":"),
+                          np.char.zfill(rng.integers(0, 60, n).astype(str), 2)).astype(object)
+    minutes[slot % PLAYERS_PER_TEAM >= 11] = None
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame({
+            "GAME_ID": np.char.add("00224", np.char.zfill((game_idx % 99999 + 1).astype(str), 5)),
+            "TEAM_ID": team_id,
+            "PLAYER_ID": 1620000 + (team_id - TEAM_IDS[0]) * 100 + slot % PLAYERS_PER_TEAM,
+            "MIN": minutes,
+            "FGM": fgm, "FGA": fga, "FG_PCT": np.nan_to_num(fgm / fga),
+            "FG3M": fg3m, "FG3A": fg3a, "FG3_PCT": np.nan_to_num(fg3m / fg3a),
+            "FTM": ftm, "FTA": fta, "FT_PCT": np.nan_to_num(ftm / fta),
+            "OREB": oreb, "DREB": dreb, "REB": oreb + dreb,
+            "AST": rng.integers(0, 12, n), "STL": rng.integers(0, 4, n), "BLK": rng.integers(0, 4, n),
+            "TO": rng.integers(0, 6, n), "PF": rng.integers(0, 6, n),
+            "PTS": 2 * fgm + fg3m + ftm, "PLUS_MINUS": rng.integers(-20, 21, n),
+        })
@@ -1,7 +1,10 @@
-from extract import extract_player_stats, get_player_positions, get_player_heights, extract_games_by_season, extract_player_game_stats_for_season
+from extract import extract_player_stats, get_player_profiles, extract_games_by_season, extract_player_game_stats_bulk
 from transform import transform_players, transform_teams, transform_player_stats, aggregate_player_game_stats, deduplicate_players
 from load import load_table
 from config import CURRENT_SEASON
+from helpers.store import SeasonStore
+from helpers.season_totals import SeasonTotals
+from helpers.metrics import metrics
 
 def main():
     ## --- Extract ---
@@ -16,14 +19,14 @@ def main():
     # # Step 2: Get unique player_ids
     # player_ids = raw_df["PLAYER_ID"].unique().tolist()
 
-    # # Step 3: Fetch or load positions and height
-    # positions = get_player_positions(player_ids)
-    # heights = get_player_heights(player_ids)
+    # # Step 3: Fetch or load player profiles (one CommonPlayerInfo call per new player)
+    # profiles = get_player_profiles(player_ids)
 
-    # # Step 4: Enrich DataFrame with positions and height
+    # # Step 4: Enrich DataFrame with position, height and weight
     # players_df = transform_players(raw_df)
-    # players_df["position"] = players_df["player_id"].map(positions)
-    # players_df["height"] = players_df["player_id"].map(heights)
+    # players_df["position"] = players_df["player_id"].map(profiles.lookup("position"))
+    # players_df["height"] = players_df["player_id"].map(profiles.lookup("height"))
+    # players_df["weight"] = players_df["player_id"].map(profiles.lookup("weight"))
 
     # # Step 5: Transform player stats to fit SQL DB
     # player_stats_df = transform_player_stats(raw_df, CURRENT_SEASON)
@@ -33,12 +36,14 @@ def main():
     # player_stats_df = aggregate_player_game_stats(player_stats_df)
 
     # Step 7: Extract all games for the current season (to link with player stats)
-    games_df = extract_games_by_season()
-    game_ids = games_df["game_id"].unique().tolist()
+    games_df = extract_games_by_season(CURRENT_SEASON)
     print("✅ Game extraction completed")
 
     # Step 8: Extract player game stats for all games in the season
-    player_per_game_stats_df = extract_player_game_stats_for_season(game_ids)
+    # (bulk player game logs; only games they don't fully cover fall back to per-game box scores)
+    store = SeasonStore()
+    player_per_game_stats_df = extract_player_game_stats_bulk(
+        games_df, season=CURRENT_SEASON, store=store, max_workers=4)
     print("✅ Player game stats extraction completed")
 
     print("✅ Transform completed")
@@ -48,10 +53,14 @@ def main():
     # load_table(players_df, "player")
     # load_table(player_stats_df, "player_game_stats" )
     # load_table(games_df, "games")
-    load_table(player_per_game_stats_df, "player_per_game_stats")
+    with metrics.stage("load"):
+        load_table(player_per_game_stats_df, "player_per_game_stats", delta=True)
+    # Seed the running totals live.py adds each night's games to
+    SeasonTotals().rebuild(store, CURRENT_SEASON)
     print("✅ Load completed")
 
     print("✅ ETL completed")
+    metrics.export()
 
 if __name__ == "__main__":
     main()
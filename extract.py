@@ -1,70 +1,104 @@
 from nba_api.stats.static import players
-from nba_api.stats.endpoints import leaguedashplayerstats, scoreboardv2, boxscoretraditionalv2
+from nba_api.stats.endpoints import leaguedashplayerstats, leaguegamelog, playergamelogs, scoreboardv2, boxscoretraditionalv2
 from config import CURRENT_SEASON
 from functools import lru_cache
-from helpers.positions import load_positions_from_cache, fetch_player_positions, save_positions_to_cache
-from helpers.heights import load_heights_from_cache, fetch_player_heights, save_heights_to_cache
-from transform import normalize_games_df, normalize_player_game_stats
+from helpers.profiles import ProfileStore
+from helpers.ratelimit import RateLimiter
+from helpers.manifest import FetchManifest, OK, EMPTY, FAILED
+from helpers.store import SeasonStore, season_from_game_id
+from helpers.metrics import metrics, timed_stage
+from helpers.transport import call_endpoint, read_raw
+from transform import (normalize_games_df, normalize_game_log_df, normalize_player_game_stats, normalize_season_player_game_stats,
+                       normalize_player_game_log, reconcile_player_game_logs, PLAYER_GAME_SCHEMA_COLS)
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import time
 import random
 import os
 import numpy as np
 
-@lru_cache(maxsize=1)
-def extract_player_stats():
-    """Extract stats for all active NBA players for the current season."""
+@lru_cache(maxsize=4)
+@timed_stage("extract.player_stats")
+def extract_player_stats(season=CURRENT_SEASON):
+    """Extract stats for all active NBA players for a season (the current one by default)."""
 
     # Step 1: Get all active NBA players
     active_players = players.get_active_players()
     active_names = {p['full_name'] for p in active_players}  # use a set for fast lookup
 
     # Step 2: Pull all player stats (defaults to NBA)
-    df = leaguedashplayerstats.LeagueDashPlayerStats(season=CURRENT_SEASON).get_data_frames()[0]
+    df = call_endpoint(leaguedashplayerstats.LeagueDashPlayerStats, use_cache=False,
+                       season=season).get_data_frames()[0]
 
     # Step 3: Filter DataFrame to only include active NBA players
     df_nba = df[df['PLAYER_NAME'].isin(active_names)].reset_index(drop=True)
 
     return df_nba
 
-def get_player_positions(player_ids, delay=0.3):
-    """Load cached positions or fetch missing ones, then update cache."""
-    cached_positions = load_positions_from_cache()
-    missing_ids = [pid for pid in player_ids if str(pid) not in cached_positions]
-
-    if missing_ids:
-        print(f"Fetching {len(missing_ids)} missing player positions...")
-        new_positions = fetch_player_positions(missing_ids, delay=delay)
-        # Merge into cache
-        cached_positions.update({str(pid): pos for pid, pos in new_positions.items()})
-        save_positions_to_cache(cached_positions)
-    return {int(pid): pos for pid, pos in cached_positions.items()}
-
-def get_player_heights(player_ids, delay=0.3):
-    """Load cached heights or fetch missing ones, then update cache."""
-    cached_heights = load_heights_from_cache()
-    missing_ids = [pid for pid in player_ids if str(pid) not in cached_heights]
-
-    if missing_ids:
-        print(f"Fetching {len(missing_ids)} missing player heights...")
-        new_heights = fetch_player_heights(missing_ids, delay=delay)
-        # Merge into cache
-        cached_heights.update({str(pid): height for pid, height in new_heights.items()})
-        save_heights_to_cache(cached_heights)
-    return {int(pid): height  for pid, height in cached_heights.items()}
-
-
-def extract_games_by_season(
-    start_date="2024-10-25",
-    end_date="2025-04-15",
-    cache_file="games_2024_25.csv"):
-    """Extract NBA games for a season, normalize, and cache to disk."""
-
-    if os.path.exists(cache_file):
+@timed_stage("extract.player_profiles")
+def get_player_profiles(player_ids, max_workers=4, requests_per_second=2.0):
+    """Open the player profile cache and fetch any players it doesn't know yet."""
+    store = ProfileStore()
+    store.fetch_missing(player_ids, max_workers=max_workers, requests_per_second=requests_per_second)
+    return store
+
+
+def get_player_positions(player_ids, **kwargs):
+    """Positions keyed by player_id from the profile cache, fetching missing players."""
+    return get_player_profiles(player_ids, **kwargs).lookup("position")
+
+
+def get_player_heights(player_ids, **kwargs):
+    """Heights ('6-6') keyed by player_id from the profile cache, fetching missing players."""
+    return get_player_profiles(player_ids, **kwargs).lookup("height")
+
+
+GAME_COLUMNS = ["game_team_id", "game_id", "game_date", "season_id", "team_id"]
+
+
+@timed_stage("extract.games")
+def extract_games_by_season(season=CURRENT_SEASON, season_types=("Regular Season",), cache_file=None, refresh=None,
+                            rate_limiter=None):
+    """
+    Extract every game of a season from the team-mode league game log (one request per
+    season type instead of one ScoreboardV2 call per day), normalize, and cache per season.
+    Only games already played are listed; use extract_games_by_dates for upcoming days.
+    The season in progress gains games every night, so by default (refresh=None) only
+    finished seasons are served from the CSV cache.
+    """
+    if refresh is None:
+        refresh = season == CURRENT_SEASON
+    cache_file = cache_file or f"games_{season.replace('-', '_')}.csv"
+    if os.path.exists(cache_file) and not refresh:
+        metrics.cache_hit("games_csv")
         print(f"Loading cached season data from {cache_file}")
-        return pd.read_csv(cache_file, dtype={"game_id": str})
+        return pd.read_csv(cache_file, dtype={"game_id": str, "season_id": str})
+    metrics.cache_miss("games_csv")
+
+    logs = []
+    for season_type in season_types:
+        # The current season's log grows every night, so only finished seasons are served from the raw cache
+        response = call_endpoint(leaguegamelog.LeagueGameLog, use_cache=season != CURRENT_SEASON,
+                                 rate_limiter=rate_limiter, season=season, season_type_all_star=season_type,
+                                 player_or_team_abbreviation="T")
+        log = response.get_data_frames()[0]
+        print(f"Fetched {log['GAME_ID'].nunique() if not log.empty else 0} {season_type} games for {season}")
+        logs.append(log)
+
+    logs = [log for log in logs if not log.empty]
+    if not logs:
+        return pd.DataFrame(columns=GAME_COLUMNS)
 
+    season_df = normalize_game_log_df(pd.concat(logs, ignore_index=True))
+    season_df.to_csv(cache_file, index=False)
+    print(f"Saved normalized season data to {cache_file}")
+    return season_df
+
+
+def extract_games_by_dates(start_date, end_date, rate_limiter=None):
+    """Extract and normalize the games scheduled between two dates (inclusive), one ScoreboardV2 call per day.
+    A shared rate_limiter paces the calls; without one there is a polite delay between days."""
     current = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
     all_games = []
@@ -72,95 +106,316 @@ def extract_games_by_season(
     while current <= end:
         date_str = current.strftime("%Y-%m-%d")
         try:
-            scoreboard = scoreboardv2.ScoreboardV2(game_date=date_str)
+            scoreboard = call_endpoint(scoreboardv2.ScoreboardV2, use_cache=False, rate_limiter=rate_limiter,
+                                       game_date=date_str)
             raw_games = scoreboard.get_data_frames()[0]
             if not raw_games.empty:
-                normalized = normalize_games_df(raw_games)
-                all_games.append(normalized)
-                print(f"Fetched {len(normalized)} games for {date_str}")
+                all_games.append(normalize_games_df(raw_games))
+                print(f"Fetched {len(raw_games)} games for {date_str}")
             else:
                 print(f"No games on {date_str}")
-            time.sleep(random.uniform(0.5, 1.5))  # polite delay
+            if rate_limiter is None:
+                time.sleep(random.uniform(0.5, 1.5))  # polite delay
         except Exception as e:
             print(f"Error fetching games for {date_str}: {e}")
             time.sleep(5)
         current += timedelta(days=1)
 
     if all_games:
-        season_df = pd.concat(all_games, ignore_index=True)
-        season_df.to_csv(cache_file, index=False)
-        print(f"Saved normalized season data to {cache_file}")
-        return season_df
-    else:
-        return pd.DataFrame(columns=["game_team_id", "game_id", "game_date", "season_id", "team_id"])
+        return pd.concat(all_games, ignore_index=True)
+    return pd.DataFrame(columns=GAME_COLUMNS)
 
 
-def extract_player_game_stats_for_game(game_id: str, cache_dir="player_game_cache") -> pd.DataFrame:
+def game_is_final(game_id, game_date=None) -> bool:
     """
-    Fetch per-player stats for a single game and cache to CSV.
+    Whether a game's box score can no longer change: it belongs to a past season, or it was
+    played before yesterday. Current-season games of unknown date count as not final.
     """
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_file = os.path.join(cache_dir, f"{game_id}.csv")
+    if season_from_game_id(game_id) != CURRENT_SEASON:
+        return True
+    if game_date is None:
+        return False
+    return pd.Timestamp(game_date).date() < datetime.now().date() - timedelta(days=1)
 
-    # Resume from cache and skip empty CSVs
-    if os.path.exists(cache_file):
-        df = pd.read_csv(cache_file, dtype={"game_id": str})
-        if df.empty:
-            print(f"[CACHE] Previous fetch for {game_id} was empty, skipping...")
-            return pd.DataFrame()
-        print(f"[CACHE] Loading cached stats for {game_id}")
-        return df
 
+def fetch_player_game_stats(game_id: str, rate_limiter=None, normalize=True, cacheable=None):
+    """
+    Fetch and normalize one game's box score with retries.
+    normalize=False returns the raw PlayerStats frame for callers that normalize in batch.
+    Returns None when nothing usable came back, so callers know not to cache the game.
+    The raw response is only cached once the game is final (cacheable; default game_is_final),
+    so a box score fetched mid-game is never replayed.
+    """
+    if cacheable is None:
+        cacheable = game_is_final(game_id)
     max_retries = 5
     delay = 2
     for attempt in range(max_retries):
         try:
-            box = boxscoretraditionalv2.BoxScoreTraditionalV2(game_id=game_id, timeout=60)
+            box = call_endpoint(boxscoretraditionalv2.BoxScoreTraditionalV2, rate_limiter=rate_limiter,
+                                cacheable=cacheable, game_id=game_id)
             raw_dfs = box.get_data_frames()
             if not raw_dfs:
                 print(f"No resultSet for {game_id}, skipping...")
-                return pd.DataFrame()
+                return None
 
             df = raw_dfs[0]  # Player stats
-            normalized = normalize_player_game_stats(df)  # normalization function
-            normalized.to_csv(cache_file, index=False)
-            print(f"[FETCHED] Stats for {game_id}")
-            # Polite random delay
-            time.sleep(random.uniform(2, 5))
-            return normalized
+            if normalize:
+                df = normalize_player_game_stats(df)  # normalization function
+            metrics.count("fetch.box_scores")
+            if rate_limiter is not None:
+                rate_limiter.success()
+            else:
+                # Polite random delay
+                time.sleep(random.uniform(2, 5))
+            return df
 
         except Exception as e:
             print(f"[RETRY {attempt+1}] Error fetching {game_id}: {e}")
-            time.sleep(delay)
+            metrics.count("retries.BoxScoreTraditionalV2")
+            if rate_limiter is not None:
+                # 429s and timeouts slow down every worker, not just this one
+                rate_limiter.backoff(pause=delay)
+            else:
+                time.sleep(delay)
             delay *= 2  # Exponential backoff
 
     # After all retries failed
     print(f"[FAILED] Could not fetch stats for {game_id} after {max_retries} attempts")
-    return pd.DataFrame(columns=[
-        "player_id","game_id","team_id","minutes","fgm","fga","fg_pct","fg3m","fg3a","fg3_pct",
-        "ftm","fta","ft_pct","oreb","dreb","reb","ast","stl","blk","turnovers","pf","pts",
-        "plus_minus","fantasy_points"
-    ])
+    metrics.count("failures.BoxScoreTraditionalV2")
+    return None
+
 
+def _record_fetch(manifest, game_id, df):
+    """Record a fetch outcome in the manifest and return the frame callers should get back."""
+    if df is None:
+        manifest.record(game_id, FAILED)
+        return pd.DataFrame(columns=PLAYER_GAME_SCHEMA_COLS)
+    manifest.record(game_id, OK if not df.empty else EMPTY, row_count=len(df))
+    return df
 
 
-def extract_player_game_stats_for_season(game_ids: list, cache_dir="player_game_cache") -> pd.DataFrame:
+def extract_player_game_stats_for_game(game_id: str, cache_dir="player_game_cache", rate_limiter=None,
+                                       store=None, manifest=None, settled=None, game_dates=None,
+                                       final=None) -> pd.DataFrame:
     """
-    Loop over all games in a season, extract player stats, normalize, and concatenate.
+    Fetch per-player stats for a single game and cache to CSV (or to a SeasonStore if given).
+    If a shared rate_limiter is given it paces the request instead of the polite sleep.
+    The fetch manifest decides whether to fetch: cached games are read back, while empty or
+    failed games are skipped until their TTL runs out and then fetched again.
+    settled is a FetchManifest.settled() snapshot, so season loops query the manifest once.
+    game_dates (game_id -> date) picks the store's month partition and, unless final says so
+    (e.g. the scoreboard reports the game final), whether the raw response may be cached.
     """
+    if final is None:
+        final = game_is_final(game_id, (game_dates or {}).get(game_id))
+    manifest = manifest if manifest is not None else FetchManifest()
+    if settled is None:
+        status = manifest.settled_status(game_id, store=store)
+    else:
+        status = settled.get(game_id)
+        if status == OK and store is not None and not store.has(game_id):
+            status = None  # settled in the shared manifest, but not in this store
+    due = status is None
+
+    if status in (EMPTY, FAILED):
+        metrics.cache_hit("per_game_negative")
+        return pd.DataFrame()
+
+    if store is not None:
+        if not due:
+            metrics.cache_hit("per_game_store")
+            return store.read(game_ids=[game_id])
+        metrics.cache_miss("per_game_store")
+        normalized = fetch_player_game_stats(game_id, rate_limiter=rate_limiter, cacheable=final)
+        if normalized is not None:
+            store.write(normalized, game_ids=[game_id], game_dates=game_dates)
+        return _record_fetch(manifest, game_id, normalized)
+
     os.makedirs(cache_dir, exist_ok=True)
-    all_stats = []
+    cache_file = os.path.join(cache_dir, f"{game_id}.csv")
+
+    if not due and os.path.exists(cache_file):
+        metrics.cache_hit("per_game_csv")
+        return pd.read_csv(cache_file, dtype={"game_id": str})
+    metrics.cache_miss("per_game_csv")
+
+    normalized = fetch_player_game_stats(game_id, rate_limiter=rate_limiter, cacheable=final)
+    if normalized is not None and not normalized.empty:
+        normalized.to_csv(cache_file, index=False)
+    return _record_fetch(manifest, game_id, normalized)
+
 
+def replay_player_game_stats(game_ids) -> pd.DataFrame:
+    """
+    Rebuild normalized per-game stats purely from the raw response cache (no network),
+    e.g. after changing normalize_player_game_stats. Games missing from the cache are skipped.
+    """
+    frames = []
     for gid in game_ids:
-        gid_str = str(gid).zfill(10)  # Ensure 10-digit string for NBA API
-        stats = extract_player_game_stats_for_game(gid_str, cache_dir=cache_dir)
+        cached = read_raw("BoxScoreTraditionalV2", {"game_id": str(gid).zfill(10)})
+        if cached is not None:
+            frames.append(cached.get_data_frames()[0])
+    print(f"[CACHE] Replayed {len(frames)}/{len(game_ids)} games from the raw response cache")
+    return normalize_season_player_game_stats(frames)
 
-        # Ensure normalization even for cached files
-        if not stats.empty:
-            stats = normalize_player_game_stats(stats)
-        all_stats.append(stats)
 
-    if all_stats:
-        return pd.concat(all_stats, ignore_index=True)
-    else:
-        return pd.DataFrame()
\ No newline at end of file
+def map_games(fn, game_ids, max_workers=1, requests_per_second=1.0, rate_limiter=None):
+    """Apply fn(game_id, rate_limiter) to every game, concurrently when max_workers > 1.
+    Pass rate_limiter to share one request budget across several calls."""
+    if max_workers > 1:
+        limiter = rate_limiter or RateLimiter(rate=requests_per_second, burst=max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda gid: fn(gid, limiter), game_ids))
+    return [fn(gid, rate_limiter) for gid in game_ids]
+
+
+@timed_stage("extract.player_game_stats")
+def extract_player_game_stats_for_season(
+    game_ids: list,
+    cache_dir="player_game_cache",
+    max_workers=1,
+    requests_per_second=1.0,
+    store=None,
+    game_dates=None,
+    manifest=None,
+    rate_limiter=None) -> pd.DataFrame:
+    """
+    Loop over all games in a season, extract player stats, normalize, and concatenate.
+    With max_workers > 1 games are fetched by a thread pool sharing one rate limiter
+    (rate_limiter, if given, so several seasons can share one request budget).
+    With a SeasonStore, the season comes back from one parquet read;
+    game_dates (game_id -> date) picks each game's month partition.
+    What to fetch is decided by one FetchManifest query, so expired empty/failed games are retried.
+    """
+    gid_strs = [str(gid).zfill(10) for gid in game_ids]  # Ensure 10-digit string for NBA API
+    manifest = manifest if manifest is not None else FetchManifest()
+
+    if store is not None:
+        if not store.game_ids() and os.path.isdir(cache_dir):
+            store.migrate_csv_cache(cache_dir, game_dates=game_dates)
+        if not len(manifest):
+            manifest.import_store_index(store)
+
+        missing = manifest.pending(gid_strs, store=store)
+        metrics.cache_hit("per_game_store", len(gid_strs) - len(missing))
+        metrics.cache_miss("per_game_store", len(missing))
+        print(f"[CACHE] {len(gid_strs) - len(missing)} games settled in {manifest.db_path}, fetching {len(missing)}")
+        if missing:
+            results = map_games(
+                lambda gid, limiter: fetch_player_game_stats(
+                    gid, rate_limiter=limiter, normalize=False,
+                    cacheable=game_is_final(gid, (game_dates or {}).get(gid))),
+                missing, max_workers, requests_per_second, rate_limiter)
+            fetched = [(gid, df) for gid, df in zip(missing, results) if df is not None]
+            if fetched:
+                normalized = normalize_season_player_game_stats([df for _, df in fetched])
+                store.write(normalized, game_ids=[gid for gid, _ in fetched], game_dates=game_dates)
+                rows = normalized["game_id"].value_counts() if not normalized.empty else {}
+                manifest.record_many([(gid, OK if rows.get(gid, 0) else EMPTY, rows.get(gid, 0))
+                                      for gid, _ in fetched])
+            manifest.record_many([(gid, FAILED, 0) for gid, df in zip(missing, results) if df is None])
+        return store.read(game_ids=gid_strs)
+
+    if not len(manifest) and os.path.isdir(cache_dir):
+        manifest.import_csv_cache(cache_dir)
+
+    settled = manifest.settled()
+    due = sum(gid not in settled for gid in gid_strs)
+    print(f"[CACHE] {len(gid_strs) - due} games settled in {manifest.db_path}, fetching {due}")
+    results = map_games(
+        lambda gid, limiter: extract_player_game_stats_for_game(
+            gid, cache_dir=cache_dir, rate_limiter=limiter, manifest=manifest, settled=settled,
+            game_dates=game_dates),
+        gid_strs, max_workers, requests_per_second, rate_limiter)
+
+    # Cached files are already normalized and get skipped; anything else is normalized in one pass
+    return normalize_season_player_game_stats(results)
+
+
+def _month_pages(start_date, end_date):
+    """
+    The whole calendar months covering [start_date, end_date]. Pages never depend on where
+    a run starts, so the same month always has the same raw-cache key.
+    """
+    start = pd.Timestamp(start_date).to_period("M")
+    end = pd.Timestamp(end_date).to_period("M")
+    for month in pd.period_range(start, end, freq="M"):
+        yield month.start_time.date(), month.end_time.date()
+
+
+@timed_stage("extract.player_game_logs")
+def extract_player_game_logs(start_date, end_date, season=CURRENT_SEASON, season_type="Regular Season",
+                             rate_limiter=None) -> pd.DataFrame:
+    """
+    Pull every player's game log between two dates with one PlayerGameLogs request per
+    calendar month. Months that ended before yesterday are served from the raw cache.
+    A page that fails is skipped; reconciliation sends its games to the box-score fallback.
+    """
+    settled_before = datetime.now().date() - timedelta(days=1)
+    pages = []
+    for page_start, page_end in _month_pages(start_date, end_date):
+        try:
+            response = call_endpoint(playergamelogs.PlayerGameLogs, use_cache=page_end < settled_before,
+                                     rate_limiter=rate_limiter,
+                                     season_nullable=season, season_type_nullable=season_type,
+                                     date_from_nullable=page_start.strftime("%m/%d/%Y"),
+                                     date_to_nullable=page_end.strftime("%m/%d/%Y"))
+            page = response.get_data_frames()[0]
+            print(f"Fetched {len(page)} player game logs for {page_start} to {page_end}")
+            pages.append(page)
+        except Exception as e:
+            print(f"Error fetching player game logs for {page_start} to {page_end}: {e}")
+
+    pages = [page for page in pages if not page.empty]
+    if not pages:
+        return pd.DataFrame()
+    logs = pd.concat(pages, ignore_index=True)
+    # Whole-month pages reach past the requested range
+    dates = pd.to_datetime(logs["GAME_DATE"]).dt.date
+    return logs[(dates >= pd.Timestamp(start_date).date()) & (dates <= pd.Timestamp(end_date).date())]
+
+
+@timed_stage("extract.player_game_stats_bulk")
+def extract_player_game_stats_bulk(games_df: pd.DataFrame, season=CURRENT_SEASON, store=None, manifest=None,
+                                   max_workers=4, requests_per_second=1.0,
+                                   rate_limiter=None, cache_dir="player_game_cache") -> pd.DataFrame:
+    """
+    Bulk alternative to extract_player_game_stats_for_season: season-wide player game logs
+    (tens of requests) instead of one box score per game. Games already settled in the manifest
+    are kept as stored; games the logs cover completely are written to the store, and only the
+    ones reconcile_player_game_logs rejects fall back to per-game box scores.
+    A shared rate_limiter paces every request (log pages and box scores) against one budget.
+    cache_dir is the legacy CSV cache the fallback migrates into an empty store.
+    """
+    store = store or SeasonStore()
+    manifest = manifest if manifest is not None else FetchManifest()
+    if not len(manifest):
+        manifest.import_store_index(store)
+
+    gid_strs = list(dict.fromkeys(games_df["game_id"].astype(str).str.zfill(10)))
+    game_dates = dict(zip(games_df["game_id"].astype(str).str.zfill(10), games_df["game_date"]))
+    pending = manifest.pending(gid_strs, store=store)
+    print(f"[CACHE] {len(gid_strs) - len(pending)} games settled in {manifest.db_path}, {len(pending)} to ingest")
+
+    if pending:
+        dates = pd.to_datetime(pd.Series([game_dates[gid] for gid in pending]))
+        logs = extract_player_game_logs(dates.min(), dates.max(), season=season, rate_limiter=rate_limiter)
+        rows = normalize_player_game_log(logs) if not logs.empty else pd.DataFrame(columns=PLAYER_GAME_SCHEMA_COLS)
+        rows = rows[rows["game_id"].isin(pending)]
+
+        fallback = reconcile_player_game_logs(rows, pending)
+        complete = [gid for gid in pending if gid not in set(fallback)]
+        rows = rows[rows["game_id"].isin(complete)]
+        if complete:
+            store.write(rows, game_ids=complete, game_dates=game_dates)
+            counts = rows["game_id"].value_counts()
+            manifest.record_many([(gid, OK, counts[gid]) for gid in complete])
+        print(f"[BULK] {len(complete)} games from player game logs, {len(fallback)} need box scores")
+
+        if fallback:
+            extract_player_game_stats_for_season(fallback, cache_dir=cache_dir, max_workers=max_workers,
+                                                 requests_per_second=requests_per_second, store=store,
+                                                 game_dates=game_dates, manifest=manifest, rate_limiter=rate_limiter)
+
+    return store.read(game_ids=gid_strs)
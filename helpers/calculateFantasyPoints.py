@@ -1,2 +1,72 @@
-def calc_fantasy_points(row):
-    """Calculate fantasy points based on league's scoring rules."""
\ No newline at end of file
+import numpy as np
+import pandas as pd
+from helpers.weights import LEAGUES, DEFAULT_LEAGUE
+
+# Stats computed from the box score rather than read from a column
+DERIVED_STATS = {
+    "fgmi": lambda df: df["fga"] - df["fgm"],
+    "fg3mi": lambda df: df["fg3a"] - df["fg3m"],
+    "ftmi": lambda df: df["fta"] - df["ftm"],
+    "reb": lambda df: df["oreb"] + df["dreb"],
+}
+
+
+def compile_rulesets(rulesets: dict) -> dict:
+    """
+    Turn rulesets into arrays over one shared stat list:
+    a (stats x leagues) weight matrix, a bonus-category mask with per-league thresholds,
+    and a cumulative bonus table indexed by [categories reached, league].
+    """
+    names = list(rulesets)
+    stats = sorted({stat for rules in rulesets.values()
+                    for stat in list(rules["weights"]) + list(rules.get("bonus_categories", []))})
+    index = {stat: i for i, stat in enumerate(stats)}
+
+    weights = np.zeros((len(stats), len(names)))
+    bonus_mask = np.zeros((len(stats), len(names)), dtype=bool)
+    thresholds = np.zeros(len(names))
+    bonus_table = np.zeros((len(stats) + 1, len(names)))
+
+    for j, name in enumerate(names):
+        rules = rulesets[name]
+        for stat, weight in rules["weights"].items():
+            weights[index[stat], j] = weight
+        for stat in rules.get("bonus_categories", []):
+            bonus_mask[index[stat], j] = True
+        thresholds[j] = rules.get("bonus_threshold", 10)
+        for count, bonus in rules.get("bonuses", {}).items():
+            bonus_table[int(count):, j] += bonus
+
+    return {"names": names, "stats": stats, "weights": weights, "bonus_mask": bonus_mask,
+            "thresholds": thresholds, "bonus_table": bonus_table}
+
+
+def stat_block(df: pd.DataFrame, stats: list) -> np.ndarray:
+    """(rows x stats) float matrix of the stats a compiled ruleset needs."""
+    columns = [DERIVED_STATS[stat](df) if stat in DERIVED_STATS else df[stat] for stat in stats]
+    return np.column_stack([np.asarray(col, dtype=float) for col in columns])
+
+
+def score_rulesets(df: pd.DataFrame, rulesets=None) -> pd.DataFrame:
+    """
+    Score every row under many rulesets at once: one matrix multiply for the weighted
+    stats plus one broadcast comparison for the double-double style bonuses.
+    Returns one column per league, named fantasy_points_<league>.
+    """
+    compiled = compile_rulesets(rulesets or LEAGUES)
+    stats = stat_block(df, compiled["stats"])
+
+    points = stats @ compiled["weights"]
+
+    hits = (stats[:, :, None] >= compiled["thresholds"][None, None, :]) & compiled["bonus_mask"][None, :, :]
+    counts = hits.sum(axis=1)
+    points += compiled["bonus_table"][counts, np.arange(len(compiled["names"]))]
+
+    return pd.DataFrame(points, index=df.index,
+                        columns=[f"fantasy_points_{name}" for name in compiled["names"]])
+
+
+def calc_fantasy_points(row, league=DEFAULT_LEAGUE):
+    """Calculate fantasy points based on league's scoring rules."""
+    frame = pd.DataFrame([dict(row)])
+    return float(score_rulesets(frame, {league: LEAGUES[league]}).iloc[0, 0])
@@ -1,3 +1,5 @@
+import pandas as pd
+
 def convert_minutes_to_float(min_str):
   """Convert 'MM:SS' string to float minutes."""
   if isinstance(min_str, str) and ":" in min_str:
@@ -7,4 +9,16 @@ def convert_minutes_to_float(min_str):
   try:
       return round(float(min_str), 2)  # already numeric (edge case)
   except:
-      return 0.0  # handle missing values safely
\ No newline at end of file
+      return 0.0  # handle missing values safely
+
+def convert_minutes_column(minutes: pd.Series) -> pd.Series:
+  """Vectorized convert_minutes_to_float for a whole column of 'MM:SS' strings / numbers."""
+  if minutes.empty or pd.api.types.is_numeric_dtype(minutes):
+      return minutes.astype(float).fillna(0.0).round(2)
+
+  parts = minutes.astype(str).str.split(":", n=1, expand=True)
+  mins = pd.to_numeric(parts[0], errors="coerce").astype(float)
+  if parts.shape[1] > 1:
+      secs = pd.to_numeric(parts[1], errors="coerce").astype(float)
+      mins = mins.where(secs.isna(), mins + secs / 60)
+  return mins.fillna(0.0).round(2)
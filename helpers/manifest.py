@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import threading
+import time
+
+MANIFEST_DB = "fetch_manifest.db"
+
+OK, EMPTY, FAILED = "ok", "empty", "failed"
+
+# Games that should not be fetched right now: ok, or a negative result still within its TTL
+_SETTLED_WHERE = ("status = 'ok' OR (status = 'empty' AND fetched_at > ?) "
+                  "OR (status = 'failed' AND fetched_at > ? - ? * (1 << MIN(attempts - 1, 6)))")
+
+# How long a negative result is trusted before the game is re-queued (seconds)
+EMPTY_TTL = 12 * 3600
+FAILED_TTL = 3600  # doubled for every further failed attempt, up to 64x
+
+
+class FetchManifest:
+    """
+    SQLite index of every box-score fetch: status (ok / empty / failed), when it happened,
+    how many attempts it took and how many rows came back.
+    Successful games stay cached forever; empty and failed ones expire after a TTL and are
+    fetched again, so games that were empty before tip-off eventually get their data.
+    Safe to share between fetch threads.
+    """
+
+    def __init__(self, db_path=MANIFEST_DB, empty_ttl=EMPTY_TTL, failed_ttl=FAILED_TTL):
+        self.db_path = db_path
+        self.empty_ttl = empty_ttl
+        self.failed_ttl = failed_ttl
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS game_fetch ("
+            "game_id TEXT PRIMARY KEY, status TEXT NOT NULL, fetched_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0, row_count INTEGER NOT NULL DEFAULT 0)")
+        self.conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM game_fetch").fetchone()[0]
+
+    def record(self, game_id, status, row_count=0):
+        """Upsert the outcome of one fetch; attempts counts consecutive non-ok results."""
+        self.record_many([(game_id, status, row_count)])
+
+    def record_many(self, outcomes):
+        """Record (game_id, status, row_count) tuples in one transaction."""
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                "INSERT INTO game_fetch (game_id, status, fetched_at, attempts, row_count) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT(game_id) DO UPDATE SET status = excluded.status, fetched_at = excluded.fetched_at, "
+                "row_count = excluded.row_count, "
+                "attempts = CASE WHEN excluded.status = 'ok' THEN 1 ELSE game_fetch.attempts + 1 END",
+                [(str(gid).zfill(10), status, now, int(rows)) for gid, status, rows in outcomes])
+            self.conn.commit()
+
+    def _settled_params(self, now):
+        now = now or time.time()
+        return now - self.empty_ttl, now, self.failed_ttl
+
+    def settled(self, now=None, store=None) -> dict:
+        """
+        game_id -> status for every game that should NOT be fetched right now (one query).
+        The manifest is shared by every store, so with store given an ok game that store
+        doesn't hold (e.g. it was fetched into another backfill shard) counts as due.
+        """
+        with self._lock:
+            rows = self.conn.execute(f"SELECT game_id, status FROM game_fetch WHERE {_SETTLED_WHERE}",
+                                     self._settled_params(now)).fetchall()
+        if store is not None:
+            stored = store.game_ids()
+            rows = [(gid, status) for gid, status in rows if status != OK or gid in stored]
+        return dict(rows)
+
+    def settled_status(self, game_id, now=None, store=None):
+        """settled() for one game: its status if it should not be fetched right now, else None."""
+        game_id = str(game_id).zfill(10)
+        with self._lock:
+            row = self.conn.execute(f"SELECT status FROM game_fetch WHERE game_id = ? AND ({_SETTLED_WHERE})",
+                                    (game_id, *self._settled_params(now))).fetchone()
+        if row is None or (store is not None and row[0] == OK and not store.has(game_id)):
+            return None
+        return row[0]
+
+    def pending(self, game_ids, now=None, store=None) -> list:
+        """The subset of game_ids that has never been fetched or whose negative result expired
+        (or, with store given, that is ok but missing from that store)."""
+        settled = self.settled(now, store=store)
+        return [gid for gid in (str(g).zfill(10) for g in game_ids) if gid not in settled]
+
+    def status(self, game_id):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT status, fetched_at, attempts, row_count FROM game_fetch WHERE game_id = ?",
+                (str(game_id).zfill(10),)).fetchone()
+        return None if row is None else dict(zip(["status", "fetched_at", "attempts", "row_count"], row))
+
+    def import_csv_cache(self, cache_dir="player_game_cache"):
+        """Seed the manifest from the old per-game CSV cache. Empty CSVs keep their file time,
+        so they expire on the normal TTL instead of being skipped forever."""
+        outcomes = []
+        for f in os.listdir(cache_dir):
+            if not f.endswith(".csv"):
+                continue
+            path = os.path.join(cache_dir, f)
+            with open(path, "r") as fh:
+                rows = sum(1 for _ in fh) - 1  # minus header
+            outcomes.append((f[:-len(".csv")], OK if rows > 0 else EMPTY, max(rows, 0), os.path.getmtime(path)))
+        self._import(outcomes)
+        print(f"Indexed {len(outcomes)} cached games from {cache_dir} into {self.db_path}")
+
+    def import_store_index(self, store):
+        """Seed the manifest from a SeasonStore index; zero-row games are due for a retry straight away."""
+        now = time.time()
+        self._import([(gid, OK, entry["rows"], now) if entry["rows"] else (gid, EMPTY, 0, 0.0)
+                      for gid, entry in store.index().items()])
+
+    def _import(self, outcomes):
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO game_fetch (game_id, status, fetched_at, attempts, row_count) "
+                "VALUES (?, ?, ?, 1, ?)",
+                [(str(gid).zfill(10), status, fetched_at, rows) for gid, status, rows, fetched_at in outcomes])
+            self.conn.commit()
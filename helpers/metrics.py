@@ -0,0 +1,168 @@
+"""
+Run metrics for the ETL: stage wall time, API latency per endpoint, retries/backoffs,
+cache hits and misses per cache, and rows/s per load.
+
+Everything records into the module-level `metrics` registry, which is thread safe
+(fetch workers report from their own threads). `metrics.export(path)` writes one JSON
+summary per run. Set NBA_ETL_PROFILE=1 (or call `metrics.enable_profiling(dir)`) to also
+cProfile every `stage(...)` block and dump a .prof file per stage call, named
+<stage>.<run id>.<n>.prof so repeated calls, runs and concurrent processes never overwrite
+each other (the run id is the start time and pid).
+"""
+import cProfile
+import functools
+import glob
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60]
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiling = threading.local()  # only the outermost stage per thread is profiled
+        self.reset()
+        self.profile_dir = "profiles" if os.environ.get("NBA_ETL_PROFILE") else None
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self.run_id = f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(self.started_at))}-{os.getpid()}"
+            self.stages = {}
+            self._profile_seq = {}
+            self.api_latency = {}
+            self.counters = {}
+            self.caches = {}
+            self.loads = []
+
+    def enable_profiling(self, profile_dir="profiles"):
+        self.profile_dir = profile_dir
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def cache_hit(self, cache, n=1):
+        with self._lock:
+            self.caches.setdefault(cache, {"hits": 0, "misses": 0})["hits"] += n
+
+    def cache_miss(self, cache, n=1):
+        with self._lock:
+            self.caches.setdefault(cache, {"hits": 0, "misses": 0})["misses"] += n
+
+    def record_stage(self, name, seconds):
+        with self._lock:
+            self.stages.setdefault(name, []).append(seconds)
+
+    def record_api_call(self, endpoint, seconds, ok=True):
+        with self._lock:
+            self.api_latency.setdefault(endpoint, []).append(seconds)
+            key = f"api.{endpoint}.{'ok' if ok else 'error'}"
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def record_load(self, table, rows, seconds, method):
+        with self._lock:
+            self.loads.append({"table": table, "rows": rows, "seconds": round(seconds, 4), "method": method,
+                               "rows_per_s": round(rows / seconds, 1) if seconds else None})
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as a pipeline stage (and cProfile it when profiling is on)."""
+        profiler = None
+        if self.profile_dir and not getattr(self._profiling, "active", False):
+            profiler = cProfile.Profile()
+            self._profiling.active = True
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profiling.active = False
+                os.makedirs(self.profile_dir, exist_ok=True)
+                with self._lock:
+                    seq = self._profile_seq[name] = self._profile_seq.get(name, 0) + 1
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{name}.{self.run_id}.{seq}.prof"))
+            self.record_stage(name, time.perf_counter() - start)
+
+    @contextmanager
+    def api_call(self, endpoint):
+        """Time one NBA API request; errors are counted and re-raised."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record_api_call(endpoint, time.perf_counter() - start, ok=False)
+            raise
+        self.record_api_call(endpoint, time.perf_counter() - start)
+
+    def summary(self) -> dict:
+        with self._lock:
+            api = {}
+            for endpoint, latencies in self.api_latency.items():
+                histogram = {f"le_{b}": sum(1 for x in latencies if x <= b) for b in LATENCY_BUCKETS}
+                histogram["le_inf"] = len(latencies)
+                api[endpoint] = {
+                    "calls": len(latencies),
+                    "mean_s": round(sum(latencies) / len(latencies), 4),
+                    "p50_s": round(_percentile(latencies, 0.5), 4),
+                    "p95_s": round(_percentile(latencies, 0.95), 4),
+                    "max_s": round(max(latencies), 4),
+                    "histogram": histogram,
+                }
+            caches = {
+                name: dict(c, hit_ratio=round(c["hits"] / (c["hits"] + c["misses"]), 4)
+                           if c["hits"] + c["misses"] else None)
+                for name, c in self.caches.items()
+            }
+            return {
+                "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "wall_seconds": round(time.time() - self.started_at, 3),
+                "stages": {name: {"calls": len(t), "seconds": round(sum(t), 4)} for name, t in self.stages.items()},
+                "api": api,
+                "caches": caches,
+                "counters": dict(self.counters),
+                "loads": list(self.loads),
+            }
+
+    def export(self, path="run_metrics.json"):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"✅ Wrote run metrics to {path}")
+
+
+metrics = Metrics()
+
+
+def timed_stage(name):
+    """Decorator form of metrics.stage for functions that are a whole stage."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with metrics.stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def print_profile(name, top=20, run_id=None):
+    """Print the hottest functions of a stage, summed over its profiles from one run (default: the latest)."""
+    profile_dir = metrics.profile_dir or "profiles"
+    files = glob.glob(os.path.join(profile_dir, f"{glob.escape(name)}.{run_id or '*'}.*.prof"))
+    if not files:
+        raise FileNotFoundError(f"No profiles for stage {name!r} in {profile_dir}")
+    if run_id is None:
+        run_id = os.path.basename(max(files, key=os.path.getmtime))[len(name) + 1:].split(".")[0]
+        files = [f for f in files if os.path.basename(f).startswith(f"{name}.{run_id}.")]
+    pstats.Stats(*sorted(files)).sort_stats("cumulative").print_stats(top)
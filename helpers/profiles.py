@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from nba_api.stats.endpoints import CommonPlayerInfo
+from helpers.ratelimit import RateLimiter
+from helpers.metrics import metrics
+from helpers.transport import call_endpoint
+
+PROFILE_DB = "player_profiles.db"
+LEGACY_CACHES = {"position": "player_positions.json", "height": "player_heights.json"}
+
+PROFILE_FIELDS = [
+    "first_name", "last_name", "position", "height", "height_inches", "weight",
+    "team_id", "team_abbreviation", "draft_year", "draft_round", "draft_number",
+    "from_year", "to_year",
+]
+
+
+def height_to_inches(height):
+    """Convert NBA 'F-I' height strings (e.g. '6-6') to inches."""
+    if not isinstance(height, str) or "-" not in height:
+        return None
+    feet, inches = height.split("-", 1)
+    try:
+        return int(feet) * 12 + int(inches)
+    except ValueError:
+        return None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None  # 'Undrafted', '' and friends
+
+
+def parse_profile(info: dict) -> dict:
+    """Map one CommonPlayerInfo row to the profile fields we keep."""
+    return {
+        "first_name": info.get("FIRST_NAME"),
+        "last_name": info.get("LAST_NAME"),
+        "position": info.get("POSITION"),
+        "height": info.get("HEIGHT"),
+        "height_inches": height_to_inches(info.get("HEIGHT")),
+        "weight": _to_int(info.get("WEIGHT")),
+        "team_id": _to_int(info.get("TEAM_ID")),
+        "team_abbreviation": info.get("TEAM_ABBREVIATION"),
+        "draft_year": _to_int(info.get("DRAFT_YEAR")),
+        "draft_round": _to_int(info.get("DRAFT_ROUND")),
+        "draft_number": _to_int(info.get("DRAFT_NUMBER")),
+        "from_year": _to_int(info.get("FROM_YEAR")),
+        "to_year": _to_int(info.get("TO_YEAR")),
+    }
+
+
+def fetch_player_profile(player_id, rate_limiter=None):
+    """Fetch one player's CommonPlayerInfo; None if the call failed."""
+    try:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        response = call_endpoint(CommonPlayerInfo, timeout=30, player_id=player_id).get_normalized_dict()
+        if rate_limiter is not None:
+            rate_limiter.success()
+        return parse_profile(response["CommonPlayerInfo"][0])
+    except Exception as e:
+        print(f"Error fetching profile for player_id {player_id}: {e}")
+        if rate_limiter is not None:
+            rate_limiter.backoff(pause=2)
+        return None
+
+
+class ProfileStore:
+    """
+    SQLite-backed player profile cache, one row per player_id.
+    Every fetched profile is committed on its own, so a crash mid-fetch keeps
+    everything fetched so far. The old positions/heights JSON caches are imported
+    the first time the store is created; those partial rows stay incomplete (complete = 0)
+    until the player's full profile has been fetched.
+    """
+
+    def __init__(self, db_path=PROFILE_DB):
+        self.db_path = db_path
+        is_new = not os.path.exists(db_path)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS player_profile (player_id INTEGER PRIMARY KEY, {', '.join(PROFILE_FIELDS)}, "
+            "complete INTEGER NOT NULL DEFAULT 0)")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(player_profile)")}
+        if "complete" not in columns:
+            # Stores from before the flag: only a full fetch sets the name fields
+            self.conn.execute("ALTER TABLE player_profile ADD COLUMN complete INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("UPDATE player_profile SET complete = 1 WHERE first_name IS NOT NULL")
+        self.conn.commit()
+        if is_new:
+            self._import_legacy_caches()
+
+    def _import_legacy_caches(self):
+        legacy = {}
+        for field, cache_file in LEGACY_CACHES.items():
+            if os.path.exists(cache_file):
+                with open(cache_file, "r") as f:
+                    for pid, value in json.load(f).items():
+                        legacy.setdefault(int(pid), {})[field] = value
+        for pid, values in legacy.items():
+            if values.get("height") is not None:
+                values["height_inches"] = height_to_inches(values["height"])
+            self.save(pid, values, commit=False)
+        self.conn.commit()
+        if legacy:
+            print(f"Imported {len(legacy)} players from legacy position/height caches")
+
+    def save(self, player_id, profile: dict, commit=True):
+        """Upsert the given fields; a profile with every field marks the player complete."""
+        fields = [f for f in PROFILE_FIELDS if f in profile]
+        if len(fields) == len(PROFILE_FIELDS):
+            profile, fields = dict(profile, complete=1), fields + ["complete"]
+        placeholders = ", ".join("?" for _ in fields)
+        updates = ", ".join(f"{f} = excluded.{f}" for f in fields)
+        self.conn.execute(
+            f"INSERT INTO player_profile (player_id, {', '.join(fields)}) VALUES (?, {placeholders}) "
+            f"ON CONFLICT(player_id) DO UPDATE SET {updates}",
+            [int(player_id)] + [profile[f] for f in fields])
+        if commit:
+            self.conn.commit()
+
+    def missing(self, player_ids):
+        """player_ids without a complete profile (unknown, or only imported from the legacy caches)."""
+        known = {row[0] for row in self.conn.execute("SELECT player_id FROM player_profile WHERE complete = 1")}
+        return [pid for pid in player_ids if int(pid) not in known]
+
+    def fetch_missing(self, player_ids, max_workers=4, requests_per_second=2.0):
+        """Fetch CommonPlayerInfo once per player without a complete profile, concurrently under a shared rate limit."""
+        missing = self.missing(player_ids)
+        metrics.cache_hit("player_profiles", len(player_ids) - len(missing))
+        metrics.cache_miss("player_profiles", len(missing))
+        if not missing:
+            return 0
+
+        print(f"Fetching {len(missing)} missing player profiles...")
+        limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(fetch_player_profile, pid, limiter): pid for pid in missing}
+            for i, future in enumerate(as_completed(futures), 1):
+                pid = futures[future]
+                profile = future.result()
+                if profile is None:
+                    continue
+                self.save(pid, profile)  # sqlite writes stay on this thread
+                fetched += 1
+                print(f"[{i}/{len(missing)}] {pid} → {profile['position']}, {profile['height']}")
+        return fetched
+
+    def lookup(self, field, player_ids=None) -> dict:
+        """Map player_id -> one profile field, optionally restricted to player_ids."""
+        if field not in PROFILE_FIELDS:
+            raise ValueError(f"Unknown profile field: {field}")
+        rows = self.conn.execute(f"SELECT player_id, {field} FROM player_profile").fetchall()
+        if player_ids is not None:
+            wanted = {int(pid) for pid in player_ids}
+            rows = [row for row in rows if row[0] in wanted]
+        return dict(rows)
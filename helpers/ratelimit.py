@@ -0,0 +1,54 @@
+import threading
+import time
+from helpers.metrics import metrics
+
+
+class RateLimiter:
+    """Token-bucket rate limiter shared by every worker hitting the NBA API.
+
+    `rate` is the requests-per-second ceiling and `burst` is how many requests
+    may go out back to back after an idle spell. `backoff()` halves the current
+    rate (and optionally pauses everyone) after a 429 or timeout; `success()`
+    creeps it back up towards the ceiling.
+    """
+
+    def __init__(self, rate=1.0, burst=1, min_rate=0.05, recovery=1.05):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.recovery = recovery
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def backoff(self, pause=0.0):
+        """Throttle every worker after a failed request."""
+        metrics.count("rate_limiter.backoffs")
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+            if pause:
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def success(self):
+        """Recover some of the rate lost to earlier backoffs."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * self.recovery)
@@ -0,0 +1,138 @@
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+SEASON_TOTALS_DB = "season_totals.db"
+
+# Counting columns of player_game_stats that add up across games
+SEASON_SUM_COLS = [
+    "games_played", "minutes", "points", "defensive_rebounds", "offensive_rebounds",
+    "total_rebounds", "assists", "steals", "blocks", "turnovers",
+    "fga", "fgm", "three_pta", "three_ptm", "fta", "ftm", "fouls",
+    "fantasy_points",
+]
+
+
+class SeasonTotals:
+    """
+    SQLite table of per-player season totals, maintained by adding each new game's rows
+    as a delta instead of re-summing the season. A ledger of applied (player_id, game_id)
+    pairs makes apply() idempotent, so re-running a night's games changes nothing.
+    Totals are per player and season across every team they played for; team_id is the
+    team of their latest game, so a traded player's totals follow them to the new team.
+    A season only holds full-season totals once rebuild() has seeded it from the store;
+    is_seeded() tells callers whether deltas for a season can be trusted.
+    """
+
+    def __init__(self, db_path=SEASON_TOTALS_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        sums = ", ".join(f"{col} REAL NOT NULL DEFAULT 0" for col in SEASON_SUM_COLS)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS season_totals ("
+            f"player_id INTEGER NOT NULL, season TEXT NOT NULL, team_id INTEGER, last_game_id TEXT, {sums}, "
+            "PRIMARY KEY (player_id, season))")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS applied_games ("
+            "player_id INTEGER NOT NULL, game_id TEXT NOT NULL, PRIMARY KEY (player_id, game_id))")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seeded_seasons (season TEXT PRIMARY KEY, rebuilt_at REAL NOT NULL)")
+        self.conn.commit()
+
+    def is_seeded(self, season) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM seeded_seasons WHERE season = ?", (season,)).fetchone() is not None
+
+    def rebuild(self, store, season) -> int:
+        """
+        Recompute a season's totals from every game in the SeasonStore and mark it seeded,
+        e.g. after a full load or backfill. Returns the number of players.
+        """
+        from transform import season_rows_from_games  # transform imports this module
+
+        per_game = store.read(season=season)
+        self.reset(season)
+        if not per_game.empty:
+            self.apply(season_rows_from_games(per_game, season))
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO seeded_seasons (season, rebuilt_at) VALUES (?, ?)",
+                              (season, time.time()))
+            self.conn.commit()
+            players = self.conn.execute("SELECT COUNT(*) FROM season_totals WHERE season = ?", (season,)).fetchone()[0]
+        print(f"[TOTALS] Rebuilt {season} season totals for {players} players from the store")
+        return players
+
+    def _applied(self, game_ids) -> set:
+        game_ids = list(game_ids)
+        applied = set()
+        for start in range(0, len(game_ids), 500):  # stay under SQLite's bound-parameter limit
+            chunk = game_ids[start:start + 500]
+            applied.update(self.conn.execute(
+                f"SELECT player_id, game_id FROM applied_games WHERE game_id IN ({', '.join('?' * len(chunk))})",
+                chunk).fetchall())
+        return applied
+
+    def apply(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add per-game rows (player_game_stats layout plus game_id, see
+        transform.season_rows_from_games) to the totals; rows already applied are skipped.
+        Returns the (player_id, season) pairs whose totals changed.
+        """
+        if rows.empty:
+            return pd.DataFrame(columns=["player_id", "season"])
+        rows = rows.assign(game_id=rows["game_id"].astype(str).str.zfill(10), player_id=rows["player_id"].astype(int))
+
+        with self._lock:
+            applied = self._applied(rows["game_id"].unique())
+            keys = list(zip(rows["player_id"], rows["game_id"]))
+            rows = rows[[key not in applied for key in keys]].drop_duplicates(["player_id", "game_id"])
+            if rows.empty:
+                return pd.DataFrame(columns=["player_id", "season"])
+
+            delta = rows.groupby(["player_id", "season"], as_index=False)[SEASON_SUM_COLS].sum()
+            latest = rows.sort_values("game_id").groupby(["player_id", "season"], as_index=False).last()
+            delta = delta.merge(latest[["player_id", "season", "team_id", "game_id"]], on=["player_id", "season"])
+
+            cols = ["player_id", "season", "team_id", "last_game_id"] + SEASON_SUM_COLS
+            updates = ", ".join(f"{col} = {col} + excluded.{col}" for col in SEASON_SUM_COLS)
+            self.conn.executemany(
+                f"INSERT INTO season_totals ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+                f"ON CONFLICT(player_id, season) DO UPDATE SET {updates}, "
+                "team_id = CASE WHEN excluded.last_game_id > last_game_id THEN excluded.team_id ELSE team_id END, "
+                "last_game_id = MAX(last_game_id, excluded.last_game_id)",
+                [(int(r.player_id), str(r.season), int(r.team_id), r.game_id, *(float(getattr(r, c)) for c in SEASON_SUM_COLS))
+                 for r in delta.itertuples(index=False)])
+            self.conn.executemany("INSERT INTO applied_games (player_id, game_id) VALUES (?, ?)",
+                                  list(zip(rows["player_id"].tolist(), rows["game_id"].tolist())))
+            self.conn.commit()
+        return delta[["player_id", "season"]]
+
+    def read(self, keys=None, season=None) -> pd.DataFrame:
+        """Totals for the given (player_id, season) pairs, a whole season, or everything."""
+        query = f"SELECT player_id, season, team_id, {', '.join(SEASON_SUM_COLS)} FROM season_totals"
+        if keys is None:
+            with self._lock:
+                return pd.read_sql_query(query + (" WHERE season = ?" if season else ""), self.conn,
+                                         params=[season] if season else [])
+
+        keys = pd.DataFrame(keys, columns=["player_id", "season"]).drop_duplicates()
+        player_ids = [int(pid) for pid in keys["player_id"].unique()]
+        frames = []
+        with self._lock:
+            for start in range(0, len(player_ids), 500):
+                chunk = player_ids[start:start + 500]
+                frames.append(pd.read_sql_query(f"{query} WHERE player_id IN ({', '.join('?' * len(chunk))})",
+                                                self.conn, params=chunk))
+        df = pd.concat(frames, ignore_index=True) if frames else pd.read_sql_query(query + " LIMIT 0", self.conn)
+        return df.merge(keys.astype({"player_id": "int64"}), on=["player_id", "season"])
+
+    def reset(self, season):
+        """Forget a season's totals and ledger entries (to rebuild it after stat corrections)."""
+        with self._lock:
+            self.conn.execute("DELETE FROM season_totals WHERE season = ?", (season,))
+            self.conn.execute("DELETE FROM seeded_seasons WHERE season = ?", (season,))
+            # game ids carry the season's start year: 0022400077 is 2024-25
+            self.conn.execute("DELETE FROM applied_games WHERE substr(game_id, 4, 2) = ?", (season[2:4],))
+            self.conn.commit()
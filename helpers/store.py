@@ -0,0 +1,147 @@
+import json
+import os
+import uuid
+import pandas as pd
+
+STORE_DIR = "player_game_store"
+INDEX_FILE = "_index.json"  # leading underscore keeps it out of the parquet dataset
+
+
+def season_from_game_id(game_id) -> str:
+    """Derive the season label from an NBA game id, e.g. 0022400077 -> 2024-25."""
+    start = 2000 + int(str(game_id).zfill(10)[3:5])
+    return f"{start}-{str(start + 1)[-2:]}"
+
+
+def _write_part(df, part_dir):
+    """Write a parquet part under a hidden name, then rename it so readers never see half a file."""
+    name = f"part-{uuid.uuid4().hex}.parquet"
+    tmp_path = os.path.join(part_dir, f"_{name}.tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(part_dir, name))
+
+
+class SeasonStore:
+    """
+    Parquet store for normalized per-game player stats, partitioned by season and month
+    (player_game_store/season=2024-25/month=2024-10/part-*.parquet).
+    A small JSON index records which game_ids are present and how many rows each has,
+    so games that came back empty are remembered without a file of their own.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.index_file = os.path.join(root, INDEX_FILE)
+        os.makedirs(root, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r") as f:
+                return json.load(f)
+        return {}
+
+    def _save_index(self):
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_file, self.index_file)
+
+    def game_ids(self) -> set:
+        return set(self._index)
+
+    def index(self) -> dict:
+        """game_id -> {season, month, rows} for every stored game."""
+        return dict(self._index)
+
+    def has(self, game_id) -> bool:
+        return str(game_id).zfill(10) in self._index
+
+    def write(self, df: pd.DataFrame, game_ids=None, game_dates=None):
+        """
+        Append normalized rows for a batch of games, one file per touched partition.
+        game_ids lists every game the batch covers (including empty ones);
+        game_dates maps game_id -> date and decides the month partition.
+        Games the store already holds rows for are skipped, so a batch that is fetched
+        again (e.g. after a crash before the manifest was updated) is not stored twice.
+        """
+        game_dates = {str(gid).zfill(10): str(d) for gid, d in (game_dates or {}).items()}
+        if game_ids is None:
+            game_ids = df["game_id"].unique().tolist() if not df.empty else []
+        game_ids = [str(gid).zfill(10) for gid in game_ids]
+        stored = {gid for gid in game_ids if self._index.get(gid, {}).get("rows")}
+        game_ids = [gid for gid in game_ids if gid not in stored]
+
+        if not df.empty:
+            df = df.copy()
+            df["game_id"] = df["game_id"].astype(str).str.zfill(10)
+            stored |= {gid for gid in df["game_id"].unique() if self._index.get(gid, {}).get("rows")}
+            df = df[~df["game_id"].isin(stored)]
+        if not df.empty:
+            season = df["game_id"].map(season_from_game_id)
+            month = df["game_id"].map(lambda gid: game_dates.get(gid, "unknown")[:7])
+            for (season_key, month_key), part in df.groupby([season, month]):
+                part_dir = os.path.join(self.root, f"season={season_key}", f"month={month_key}")
+                os.makedirs(part_dir, exist_ok=True)
+                _write_part(part, part_dir)
+            counts = df["game_id"].value_counts().to_dict()
+        else:
+            counts = {}
+
+        for gid in game_ids:
+            self._index[gid] = {
+                "season": season_from_game_id(gid),
+                "month": game_dates.get(gid, "unknown")[:7],
+                "rows": int(counts.get(gid, 0)),
+            }
+        self._save_index()
+
+    def read(self, game_ids=None, season=None) -> pd.DataFrame:
+        """Load stored rows with a single dataset read, optionally filtered by season and game_ids."""
+        filters = []
+        if season is not None:
+            filters.append(("season", "==", season))
+        if game_ids is not None:
+            game_ids = [str(gid).zfill(10) for gid in game_ids]
+            if not any(self._index.get(gid, {}).get("rows") for gid in game_ids):
+                return pd.DataFrame()
+            filters.append(("game_id", "in", game_ids))
+        elif not any(entry["rows"] for entry in self._index.values()):
+            return pd.DataFrame()
+
+        df = pd.read_parquet(self.root, filters=filters or None)
+        df = df.drop(columns=["season", "month"], errors="ignore")
+        df["game_id"] = df["game_id"].astype(str)
+        # Stores written before write() skipped stored games can hold a game twice
+        df = df.drop_duplicates(subset=["player_id", "game_id"], keep="last")
+        return df.reset_index(drop=True)
+
+    def compact(self, season=None):
+        """Rewrite each partition as a single file after many small incremental writes."""
+        for season_dir in sorted(os.listdir(self.root)):
+            if not season_dir.startswith("season=") or (season and season_dir != f"season={season}"):
+                continue
+            for month_dir in sorted(os.listdir(os.path.join(self.root, season_dir))):
+                part_dir = os.path.join(self.root, season_dir, month_dir)
+                parts = [p for p in os.listdir(part_dir) if p.endswith(".parquet")]
+                if len(parts) <= 1:
+                    continue
+                df = pd.concat([pd.read_parquet(os.path.join(part_dir, p)) for p in parts], ignore_index=True)
+                _write_part(df.drop_duplicates(subset=["player_id", "game_id"], keep="last"), part_dir)
+                for p in parts:
+                    os.remove(os.path.join(part_dir, p))
+
+    def migrate_csv_cache(self, cache_dir="player_game_cache", game_dates=None):
+        """One-time import of the old per-game CSV cache (empty CSVs become zero-row index entries)."""
+        files = [f for f in os.listdir(cache_dir) if f.endswith(".csv")]
+        frames = []
+        game_ids = []
+        for f in files:
+            game_ids.append(f[:-len(".csv")])
+            df = pd.read_csv(os.path.join(cache_dir, f), dtype={"game_id": str})
+            if not df.empty:
+                frames.append(df)
+
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        self.write(df, game_ids=game_ids, game_dates=game_dates)
+        print(f"Migrated {len(game_ids)} cached games from {cache_dir} into {self.root}")
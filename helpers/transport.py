@@ -0,0 +1,139 @@
+"""
+Shared transport for every nba_api endpoint call.
+
+- One pooled keep-alive `requests.Session` is installed into nba_api, so endpoint calls
+  reuse connections instead of paying a TCP/TLS handshake each time.
+- Raw JSON responses are kept in a gzip-compressed on-disk cache keyed by a hash of the
+  endpoint name and its parameters, sharded by season
+  (raw_cache/<season>/<Endpoint>/<ab>/<hash>.json.gz; calls without a season go under _).
+  Changing a normalize_* function therefore never needs a re-download: replay from the raw cache.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import uuid
+import pandas as pd
+from helpers.metrics import metrics
+from helpers.store import season_from_game_id
+
+RAW_CACHE_DIR = "raw_cache"
+POOL_SIZE = 16
+
+_session_lock = threading.Lock()
+_session = None
+
+
+def configure_session(pool_size=POOL_SIZE):
+    """Install one pooled requests.Session into nba_api (no-op on versions without set_session)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            return _session
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from nba_api.stats.library.http import NBAStatsHTTP
+        except ImportError:
+            return None
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if hasattr(NBAStatsHTTP, "set_session"):
+            NBAStatsHTTP.set_session(session)
+        _session = session
+        return session
+
+
+class RawResponse:
+    """The parts of the nba_api endpoint interface we use, built from a raw JSON payload."""
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    def _result_sets(self):
+        sets = self.payload.get("resultSets", self.payload.get("resultSet", []))
+        return [sets] if isinstance(sets, dict) else sets
+
+    def get_dict(self):
+        return self.payload
+
+    def get_data_frames(self):
+        return [pd.DataFrame(rs["rowSet"], columns=rs["headers"]) for rs in self._result_sets()]
+
+    def get_normalized_dict(self):
+        return {rs["name"]: [dict(zip(rs["headers"], row)) for row in rs["rowSet"]]
+                for rs in self._result_sets()}
+
+    def has_rows(self):
+        return any(rs.get("rowSet") for rs in self._result_sets())
+
+
+def cache_key(endpoint_name, params: dict) -> str:
+    canonical = json.dumps([endpoint_name, {k: str(v) for k, v in sorted(params.items())}])
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def season_shard(params: dict) -> str:
+    """The season a call belongs to, from its season parameter or game id ('_' if neither)."""
+    season = params.get("season") or params.get("season_nullable")
+    if season:
+        return str(season)
+    if params.get("game_id"):
+        return season_from_game_id(params["game_id"])
+    return "_"
+
+
+def _cache_path(endpoint_name, params, cache_dir):
+    key = cache_key(endpoint_name, params)
+    return os.path.join(cache_dir, season_shard(params), endpoint_name, key[:2], f"{key}.json.gz")
+
+
+def read_raw(endpoint_name, params, cache_dir=None):
+    """Cached raw response for an endpoint call, or None (never touches the network)."""
+    path = _cache_path(endpoint_name, params, cache_dir or RAW_CACHE_DIR)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt") as f:
+        return RawResponse(json.load(f))
+
+
+def _write_raw(endpoint_name, params, payload, cache_dir=None):
+    path = _cache_path(endpoint_name, params, cache_dir or RAW_CACHE_DIR)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with gzip.open(tmp_path, "wt") as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def call_endpoint(endpoint_cls, use_cache=True, timeout=60, cache_dir=None, rate_limiter=None, cacheable=True,
+                  **params) -> RawResponse:
+    """
+    Call an nba_api endpoint through the shared session, serving it from the raw cache when possible.
+    Only responses with at least one row are cached, so empty pre-game box scores are fetched
+    again later. Pass use_cache=False for live data such as today's scoreboard, and
+    cacheable=False for data that may still change (a box score of a game that isn't final):
+    it is read from the cache if there, but never written to it.
+    A rate_limiter is only charged for requests that actually go to the network.
+    """
+    name = endpoint_cls.__name__
+    if use_cache:
+        cached = read_raw(name, params, cache_dir)
+        if cached is not None:
+            metrics.cache_hit("raw_responses")
+            return cached
+        metrics.cache_miss("raw_responses")
+
+    configure_session()
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    with metrics.api_call(name):
+        response = RawResponse(endpoint_cls(timeout=timeout, **params).get_dict())
+
+    if use_cache and cacheable and response.has_rows():
+        _write_raw(name, params, response.payload, cache_dir)
+    return response
@@ -0,0 +1,130 @@
+"""
+Optional embedded DuckDB warehouse (a single local file, no server).
+
+load.load_table(..., backend="duckdb") (or NBA_ETL_BACKEND=duckdb) upserts frames into
+it: DuckDB scans the pandas frame in place, so nothing is serialized on the way in.
+The README's analysis queries ship as table macros, i.e. parameterized views:
+
+    SELECT * FROM player_summary(min_games := 20, season := '2024-25') ORDER BY z_avg_fp DESC;
+    SELECT * FROM breakouts(last_n := 5, min_games := 10) LIMIT 25;
+
+    python -m helpers.warehouse "SELECT * FROM player_summary() ORDER BY avg_fp DESC LIMIT 20"
+"""
+import sys
+import time
+from helpers.metrics import metrics
+
+DUCKDB_PATH = "nba.duckdb"
+
+# Same metrics as analytics.RollingAnalytics: DNPs (0 minutes) don't count, std is the
+# sample std, z-scores are over players with >= min_games. season filters on the game
+# id, whose 4th-5th digits are the season's start year (0022400077 is 2024-25).
+# Recency follows analytics.game_order (play-in before playoffs).
+ANALYSIS_MACROS = [
+    """
+    CREATE OR REPLACE MACRO played_games(season := NULL) AS TABLE
+    SELECT player_id, game_id, fantasy_points AS fp, minutes,
+           row_number() OVER (PARTITION BY player_id ORDER BY substr(game_id, 4, 2) DESC,
+               list_position(['1', '2', '6', '3', '5', '4'], substr(game_id, 3, 1)) DESC,
+               game_id DESC) AS recency
+    FROM player_per_game_stats
+    WHERE minutes > 0 AND (season IS NULL OR substr(game_id, 4, 2) = substr(season, 3, 2))
+    """,
+    """
+    CREATE OR REPLACE MACRO player_summary(min_games := 1, season := NULL) AS TABLE
+    WITH per_player AS (
+        SELECT player_id,
+               count(*) AS games,
+               avg(fp) AS avg_fp,
+               sum(fp) / sum(minutes) AS fp_per_min,
+               stddev_samp(fp) AS std_fp,
+               stddev_samp(fp) / avg(fp) AS cv,
+               avg(fp) FILTER (WHERE recency <= 5) AS last5_avg_fp,
+               avg(fp) FILTER (WHERE recency <= 10) AS last10_avg_fp,
+               avg(fp) FILTER (WHERE recency <= 20) AS last20_avg_fp
+        FROM played_games(season := season)
+        GROUP BY player_id
+    ), pool AS (
+        SELECT avg(avg_fp) AS mean_fp, stddev_samp(avg_fp) AS std_avg_fp,
+               avg(fp_per_min) AS mean_fpm, stddev_samp(fp_per_min) AS std_fpm
+        FROM per_player WHERE games >= min_games
+    )
+    SELECT per_player.*,
+           (avg_fp - mean_fp) / nullif(std_avg_fp, 0) AS z_avg_fp,
+           (fp_per_min - mean_fpm) / nullif(std_fpm, 0) AS z_fp_per_min
+    FROM per_player, pool
+    """,
+    """
+    CREATE OR REPLACE MACRO breakouts(last_n := 5, min_games := 10, season := NULL) AS TABLE
+    WITH per_player AS (
+        SELECT player_id, count(*) AS games, avg(fp) AS avg_fp,
+               avg(fp) FILTER (WHERE recency <= last_n) AS recent_avg_fp
+        FROM played_games(season := season)
+        GROUP BY player_id
+        HAVING count(*) >= min_games
+    ), pool AS (
+        SELECT avg(avg_fp) AS mean_fp, stddev_samp(avg_fp) AS std_fp,
+               avg(recent_avg_fp) AS mean_recent, stddev_samp(recent_avg_fp) AS std_recent
+        FROM per_player
+    )
+    SELECT player_id, games, avg_fp, recent_avg_fp,
+           (recent_avg_fp - mean_recent) / nullif(std_recent, 0)
+               - (avg_fp - mean_fp) / nullif(std_fp, 0) AS breakout_score
+    FROM per_player, pool
+    ORDER BY breakout_score DESC
+    """,
+]
+
+
+def connect(db_path=None):
+    """Open the warehouse file (created on first use); duckdb is only needed when this is called."""
+    import duckdb
+    return duckdb.connect(db_path or DUCKDB_PATH)
+
+
+def create_analysis_views(conn):
+    """(Re)create the analysis macros; player_per_game_stats must exist (upsert does this after loading it)."""
+    for macro in ANALYSIS_MACROS:
+        conn.execute(macro)
+
+
+def upsert(df, table_name: str, key_cols=None, db_path=None) -> int:
+    """
+    Upsert df into table_name: rows whose key_cols match an incoming row are replaced,
+    everything else is appended. The table is created from df's columns on first load.
+    Runs in one transaction, so a failed load leaves the table untouched.
+    """
+    if df.empty:
+        return 0
+    start = time.perf_counter()
+    if key_cols:
+        df = df.drop_duplicates(subset=key_cols, keep="last")
+
+    with connect(db_path) as conn:
+        conn.register("incoming", df)  # a view over the frame's own buffers, not a copy
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} AS SELECT * FROM incoming LIMIT 0")
+            if key_cols:
+                match = " AND ".join(f"{table_name}.{col} = incoming.{col}" for col in key_cols)
+                conn.execute(f"DELETE FROM {table_name} USING incoming WHERE {match}")
+            conn.execute(f"INSERT INTO {table_name} BY NAME SELECT * FROM incoming")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if table_name == "player_per_game_stats":
+            create_analysis_views(conn)
+
+    metrics.record_load(table_name, len(df), time.perf_counter() - start, "duckdb")
+    return len(df)
+
+
+def query(sql, params=None, db_path=None):
+    """Run a query against the warehouse and return a DataFrame."""
+    with connect(db_path) as conn:
+        return conn.execute(sql, params or []).df()
+
+
+if __name__ == "__main__":
+    print(query(sys.argv[1]).to_string(index=False))
@@ -0,0 +1,76 @@
+"""
+Fantasy scoring rulesets, declared as data.
+
+Each league maps normalized box-score columns to a per-unit weight. Besides the
+player_per_game_stats columns, weights may use the derived stats in
+calculateFantasyPoints.DERIVED_STATS (misses such as fgmi, and reb = oreb + dreb).
+Bonuses count how many of `bonus_categories` reach `bonus_threshold` in a game and
+award each entry of `bonuses` ({count: points}) once that count is reached, so a
+triple-double also earns the double-double bonus.
+"""
+
+DEFAULT_LEAGUE = "default"
+
+LEAGUES = {
+    # Our home league (the original transform.compute_fantasy_points scoring)
+    "default": {
+        "weights": {
+            "pts": 1.0,
+            "dreb": 1.0,
+            "oreb": 1.1,
+            "ast": 1.25,
+            "stl": 1.25,
+            "blk": 1.25,
+            "fgm": 0.75,
+            "fg3m": 1.15,
+            "ftm": 0.85,
+            "fgmi": -0.55,
+            "fg3mi": -0.65,
+            "ftmi": -1.0,
+            "turnovers": -1.25,
+            "pf": -1.0,
+        },
+        "bonus_categories": ["pts", "reb", "ast", "stl", "blk"],
+        "bonus_threshold": 10,
+        "bonuses": {2: 5, 3: 10, 4: 600},
+    },
+    # ESPN standard points league
+    "espn": {
+        "weights": {
+            "pts": 1.0,
+            "fg3m": 1.0,
+            "fga": -1.0,
+            "fgm": 2.0,
+            "fta": -1.0,
+            "ftm": 1.0,
+            "reb": 1.0,
+            "ast": 2.0,
+            "stl": 4.0,
+            "blk": 4.0,
+            "turnovers": -2.0,
+        },
+    },
+    # The NBA's own fantasy score (NBA_FANTASY_PTS in LeagueDashPlayerStats), which is what
+    # player_game_stats.fantasy_points holds; linear, so per-game scores sum to the season's
+    "nba": {
+        "weights": {
+            "pts": 1.0,
+            "reb": 1.2,
+            "ast": 1.5,
+            "stl": 3.0,
+            "blk": 3.0,
+            "turnovers": -1.0,
+        },
+    },
+    # Yahoo default points league
+    "yahoo": {
+        "weights": {
+            "pts": 1.0,
+            "reb": 1.2,
+            "ast": 1.5,
+            "stl": 3.0,
+            "blk": 3.0,
+            "turnovers": -1.0,
+        },
+    },
+}
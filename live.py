@@ -0,0 +1,119 @@
+"""
+In-season live mode.
+
+Polls today's scoreboard (and yesterday's, for games that end after midnight) every few
+minutes, picks up games that have gone final (GAME_STATUS_ID 3) and aren't ingested yet,
+fetches only their box scores, delta-loads those rows into player_per_game_stats and
+adds them to the running season totals (transform.update_season_totals) of the players
+who appeared in them.
+
+    python live.py                    # poll until interrupted
+    python live.py --once             # one poll, e.g. from cron
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import pandas as pd
+from nba_api.stats.endpoints import scoreboardv2
+from extract import extract_player_game_stats_for_game
+from transform import normalize_games_df, update_season_totals
+from load import load_delta, load_table
+from helpers.manifest import FetchManifest, OK
+from helpers.ratelimit import RateLimiter
+from helpers.store import SeasonStore
+from helpers.transport import call_endpoint
+from helpers.metrics import metrics
+
+GAME_FINAL = 3
+POLL_SECONDS = 180
+IDLE_SECONDS = 1800  # once every game on the slate is final and ingested
+NBA_TZ = ZoneInfo("America/New_York")  # scoreboard dates are US Eastern
+
+
+def scoreboard_games(game_date) -> pd.DataFrame:
+    """Today's GameHeader rows, always from the network (statuses change during the day)."""
+    response = call_endpoint(scoreboardv2.ScoreboardV2, use_cache=False, game_date=game_date.strftime("%Y-%m-%d"))
+    return response.get_data_frames()[0]
+
+
+def final_games(dates):
+    """(normalized games rows for every final game on the given dates, number of games not final yet)"""
+    headers = [h for h in (scoreboard_games(d) for d in dates) if not h.empty]
+    if not headers:
+        return pd.DataFrame(columns=["game_team_id", "game_id", "game_date", "season_id", "team_id"]), 0
+    headers = pd.concat(headers, ignore_index=True)
+    final = headers[headers["GAME_STATUS_ID"] == GAME_FINAL]
+    in_progress = headers["GAME_ID"].nunique() - final["GAME_ID"].nunique()
+    return normalize_games_df(final) if not final.empty else final, in_progress
+
+
+def refresh_season_totals(rows, store):
+    """Apply the new per-game rows to the running season totals and upsert the players they touched.
+    A season the totals were never seeded for is re-aggregated from store first."""
+    totals = update_season_totals(rows, store=store)
+    if not totals.empty:
+        load_table(totals, "player_game_stats", bulk=True)
+    return len(totals)
+
+
+def ingest_final_games(games_df, store, manifest, rate_limiter):
+    """Fetch, store and load every final game not yet in the manifest as OK; returns the game ids ingested."""
+    game_dates = dict(zip(games_df["game_id"], games_df["game_date"]))
+    new_ids = [gid for gid in dict.fromkeys(games_df["game_id"])
+               if (manifest.status(gid) or {}).get("status") != OK or not store.has(gid)]
+    if not new_ids:
+        return []
+
+    # The scoreboard says these are final, so an earlier empty box score is fetched again right away
+    frames = [extract_player_game_stats_for_game(gid, rate_limiter=rate_limiter, store=store, manifest=manifest,
+                                                 settled={}, game_dates=game_dates, final=True) for gid in new_ids]
+    frames = [f for f in frames if not f.empty]
+    ingested = [gid for gid in new_ids if (manifest.status(gid) or {}).get("status") == OK]
+    if not frames:
+        return ingested
+
+    rows = pd.concat(frames, ignore_index=True)
+    load_delta(rows, "player_per_game_stats")
+    refreshed = refresh_season_totals(rows, store)
+    metrics.count("live.games_ingested", len(ingested))
+    print(f"[LIVE] Ingested {len(ingested)} final games ({len(rows)} rows), refreshed {refreshed} season totals")
+    return ingested
+
+
+def poll_once(store, manifest, rate_limiter):
+    """One poll: returns (games ingested, games still in progress or scheduled)."""
+    today = datetime.now(NBA_TZ).date()
+    games_df, remaining = final_games([today - timedelta(days=1), today])
+    ingested = ingest_final_games(games_df, store, manifest, rate_limiter) if not games_df.empty else []
+    return ingested, remaining
+
+
+def run_live(poll_seconds=POLL_SECONDS, idle_seconds=IDLE_SECONDS, once=False):
+    store = SeasonStore()
+    manifest = FetchManifest()
+    rate_limiter = RateLimiter(rate=1.0)
+    while True:
+        try:
+            ingested, remaining = poll_once(store, manifest, rate_limiter)
+        except Exception as e:
+            print(f"[LIVE] Poll failed: {e}")
+            ingested, remaining = [], 1
+        if once:
+            return ingested
+        wait = poll_seconds if remaining else idle_seconds
+        print(f"[LIVE] {remaining} games not final yet, next poll in {wait}s")
+        time.sleep(wait)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="poll once and exit")
+    parser.add_argument("--poll-seconds", type=int, default=POLL_SECONDS)
+    parser.add_argument("--idle-seconds", type=int, default=IDLE_SECONDS)
+    args = parser.parse_args()
+    run_live(args.poll_seconds, args.idle_seconds, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,86 @@
-from config import engine
-from sqlalchemy.dialects.postgresql import insert
+import io
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from helpers.metrics import metrics
+from transform import to_load_types
 
-def load_table(df, table_name: str):
-    """Append dataframe into target Postgres table with upsert where needed."""
-    if table_name in ("player", "team"):
+# Natural keys used to upsert each table when bulk loading
+TABLE_KEYS = {
+    "player": ["player_id"],
+    "team": ["team_id"],
+    "games": ["game_team_id"],
+    "player_game_stats": ["player_id", "season"],
+    "player_per_game_stats": ["player_id", "game_id"],
+}
+
+# Created from config.engine on first use (see get_engine); benchmarks may assign their own
+engine = None
+
+# Local ledger of the row hashes already loaded into each table (used by delta loads)
+LOAD_STATE_DIR = "load_state"
+LEDGER_DB = "ledger.db"
+
+# "postgres" (config.engine) or "duckdb" (the local helpers.warehouse file)
+BACKEND = os.environ.get("NBA_ETL_BACKEND", "postgres")
+
+def get_engine():
+    """The SQLAlchemy engine, imported from config only when something is actually loaded."""
+    global engine
+    if engine is None:
+        from config import engine as config_engine
+        engine = config_engine
+    return engine
+
+
+def load_table(df, table_name: str, bulk=False, delta=False, chunksize=None, max_chunk_mb=64, backend=None):
+    """Append dataframe into target Postgres table with upsert where needed.
+    bulk=True streams the frame through COPY and a set-based upsert instead;
+    delta=True bulk-upserts only rows that are new or changed since the last load.
+    backend="duckdb" upserts into the local DuckDB file instead (default: BACKEND).
+    Compact frames (transform.to_compact) are converted back to the table types here."""
+    df = to_load_types(df)
+    if (backend or BACKEND) == "duckdb":
+        load_duckdb(df, table_name)
+        return
+    if delta:
+        load_delta(df, table_name, chunksize=chunksize, max_chunk_mb=max_chunk_mb)
+        return
+    if bulk:
+        copy_load(df, table_name, conflict_cols=TABLE_KEYS.get(table_name),
+                  chunksize=chunksize, max_chunk_mb=max_chunk_mb)
+    elif table_name in ("player", "team"):
         # Use upsert for dimension tables
-        df.to_sql(table_name, engine, if_exists="append", index=False, method=upsert_method)
+        start = time.perf_counter()
+        df.to_sql(table_name, get_engine(), if_exists="append", index=False, method=upsert_method)
+        metrics.record_load(table_name, len(df), time.perf_counter() - start, "upsert")
     else:
         # Use plain multi-row inserts for fact tables (e.g., stats history)
-        df.to_sql(table_name, engine, if_exists="append", index=False, method="multi")
+        start = time.perf_counter()
+        df.to_sql(table_name, get_engine(), if_exists="append", index=False, method="multi")
+        metrics.record_load(table_name, len(df), time.perf_counter() - start, "multi")
 
     print(f"✅ Loaded {len(df)} rows into {table_name}")
 
 
+def load_duckdb(df, table_name: str, key_cols=None, db_path=None):
+    """Upsert into the embedded DuckDB warehouse by the table's natural key (see helpers.warehouse)."""
+    from helpers.warehouse import upsert
+
+    rows = upsert(to_load_types(df), table_name, key_cols=key_cols or TABLE_KEYS.get(table_name), db_path=db_path)
+    print(f"✅ Loaded {rows} rows into {table_name} (duckdb)")
+    return rows
+
+
 def upsert_method(table, conn, keys, data_iter):
     """
     Custom upsert method for Postgres.
     Uses ON CONFLICT DO UPDATE for deduplicating rows by PK.
     """
+    from sqlalchemy.dialects.postgresql import insert
+
     data = [dict(zip(keys, row)) for row in data_iter]
     stmt = insert(table.table).values(data)
 
@@ -29,4 +92,174 @@ def upsert_method(table, conn, keys, data_iter):
         set_=update_dict
     )
 
-    conn.execute(upsert_stmt)
\ No newline at end of file
+    conn.execute(upsert_stmt)
+
+
+def chunk_rows(df, max_chunk_mb=64):
+    """Rows per COPY chunk so a chunk's CSV buffer stays around max_chunk_mb."""
+    if df.empty:
+        return 1
+    # CSV text runs a few times larger than the in-memory numeric columns
+    bytes_per_row = 4 * df.memory_usage(deep=True, index=False).sum() / len(df)
+    return max(1, int(max_chunk_mb * 1024 * 1024 / bytes_per_row))
+
+
+def copy_load(df, table_name: str, conflict_cols=None, chunksize=None, max_chunk_mb=64):
+    """
+    Stream df into a temporary staging table with COPY, chunk by chunk, then merge it
+    into table_name with one INSERT ... SELECT ... ON CONFLICT (conflict_cols) DO UPDATE.
+    Without conflict_cols the staging rows are simply appended.
+    Everything runs in one transaction, so a failed load leaves the target untouched.
+    """
+    if df.empty:
+        return 0
+
+    df = to_load_types(df)
+    start = time.perf_counter()
+    chunksize = chunksize or chunk_rows(df, max_chunk_mb)
+    staging = f"{table_name}_staging"
+    cols = ", ".join(df.columns)
+
+    raw_conn = get_engine().raw_connection()
+    try:
+        cur = raw_conn.cursor()
+        cur.execute(f"CREATE TEMP TABLE {staging} (LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+        for offset in range(0, len(df), chunksize):
+            buffer = io.StringIO()
+            df.iloc[offset:offset + chunksize].to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cur.copy_expert(f"COPY {staging} ({cols}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+        if conflict_cols:
+            keys = ", ".join(conflict_cols)
+            update_cols = [c for c in df.columns if c not in conflict_cols]
+            action = ("DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
+                      if update_cols else "DO NOTHING")
+            # DISTINCT ON keeps one staging row per key; ON CONFLICT can't touch a row twice
+            cur.execute(
+                f"INSERT INTO {table_name} ({cols}) "
+                f"SELECT DISTINCT ON ({keys}) {cols} FROM {staging} "
+                f"ON CONFLICT ({keys}) {action}")
+        else:
+            cur.execute(f"INSERT INTO {table_name} ({cols}) SELECT {cols} FROM {staging}")
+
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+
+    metrics.record_load(table_name, len(df), time.perf_counter() - start, "copy")
+    return len(df)
+
+
+def row_hashes(df) -> pd.Series:
+    """Content hash per row; numbers are hashed as float64 so int/float round trips don't count as changes."""
+    canonical = df.apply(lambda col: col.astype("float64")
+                         if pd.api.types.is_numeric_dtype(col) else col.astype(str))
+    return pd.util.hash_pandas_object(canonical, index=False)
+
+
+def row_keys(df, key_cols) -> pd.Series:
+    """One string per row joining its key values ('203999|0022400077'); integral ids lose any float '.0'."""
+    parts = [df[col].astype("int64").astype(str) if pd.api.types.is_numeric_dtype(df[col]) else df[col].astype(str)
+             for col in key_cols]
+    keys = parts[0]
+    for part in parts[1:]:
+        keys = keys + "|" + part
+    return keys.reset_index(drop=True)
+
+
+_ledger_conn = None
+_ledger_lock = threading.Lock()
+
+
+def _ledger():
+    """SQLite ledger under LOAD_STATE_DIR (opened once), importing any old per-table parquet ledgers."""
+    global _ledger_conn
+    if _ledger_conn is None:
+        os.makedirs(LOAD_STATE_DIR, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(LOAD_STATE_DIR, LEDGER_DB), check_same_thread=False)
+        conn.execute("CREATE TABLE IF NOT EXISTS row_hashes ("
+                     "table_name TEXT NOT NULL, row_key TEXT NOT NULL, row_hash INTEGER NOT NULL, "
+                     "PRIMARY KEY (table_name, row_key))")
+        for legacy in [f for f in os.listdir(LOAD_STATE_DIR) if f.endswith(".parquet")]:
+            table_name = legacy[:-len(".parquet")]
+            old = pd.read_parquet(os.path.join(LOAD_STATE_DIR, legacy))
+            key_cols = [c for c in old.columns if c != "row_hash"]
+            conn.executemany("INSERT OR REPLACE INTO row_hashes VALUES (?, ?, ?)",
+                             zip([table_name] * len(old), row_keys(old, key_cols),
+                                 old["row_hash"].to_numpy(dtype="uint64").view("int64").tolist()))
+            conn.commit()
+            os.replace(os.path.join(LOAD_STATE_DIR, legacy), os.path.join(LOAD_STATE_DIR, legacy + ".imported"))
+        conn.commit()
+        _ledger_conn = conn
+    return _ledger_conn
+
+
+def read_ledger(table_name, keys) -> dict:
+    """row_key -> row_hash already loaded, for just these keys (one indexed lookup per batch)."""
+    with _ledger_lock:
+        conn = _ledger()
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_keys (row_key TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM batch_keys")
+        conn.executemany("INSERT OR IGNORE INTO batch_keys VALUES (?)", ((key,) for key in keys))
+        # CROSS JOIN keeps batch_keys as the outer loop: one primary-key probe per batch key
+        rows = conn.execute("SELECT l.row_key, l.row_hash FROM batch_keys b CROSS JOIN row_hashes l "
+                            "ON l.table_name = ? AND l.row_key = b.row_key", (table_name,)).fetchall()
+    return dict(rows)
+
+
+def write_ledger(ledger, table_name):
+    """Record the (row_key, row_hash) rows of a committed load."""
+    with _ledger_lock:
+        conn = _ledger()
+        conn.executemany("INSERT OR REPLACE INTO row_hashes (table_name, row_key, row_hash) VALUES (?, ?, ?)",
+                         zip([table_name] * len(ledger), ledger["row_key"].tolist(), ledger["row_hash"].tolist()))
+        conn.commit()
+
+
+def reset_ledger(table_name):
+    """Forget what was loaded into table_name, so the next delta load reloads everything."""
+    with _ledger_lock:
+        conn = _ledger()
+        conn.execute("DELETE FROM row_hashes WHERE table_name = ?", (table_name,))
+        conn.commit()
+
+
+def delta_rows(df, table_name, key_cols=None):
+    """
+    Split df into rows that still need loading (new key or changed content) and the
+    ledger rows to record once they are loaded. Only df's own keys are looked up, so the
+    cost follows the batch, not everything ever loaded.
+    """
+    key_cols = key_cols or TABLE_KEYS[table_name]
+    current = pd.DataFrame({"row_key": row_keys(df, key_cols),
+                            "row_hash": row_hashes(df).to_numpy(dtype="uint64").view("int64")})
+    loaded = read_ledger(table_name, current["row_key"].unique())
+    changed = (current["row_hash"] != current["row_key"].map(loaded)).to_numpy()
+    return df[changed], current[changed].drop_duplicates(subset="row_key", keep="last")
+
+
+def load_delta(df, table_name: str, key_cols=None, chunksize=None, max_chunk_mb=64, backend=None):
+    """
+    Idempotent load: upsert only rows whose (key, content hash) isn't in the local ledger yet.
+    The ledger is only advanced after the upsert commits, so re-running after a failure is safe.
+    Call reset_ledger(table_name) to force a full reload (e.g. after truncating the table).
+    The ledger tracks Postgres; with the DuckDB backend every row is upserted (already idempotent).
+    """
+    key_cols = key_cols or TABLE_KEYS[table_name]
+    if (backend or BACKEND) == "duckdb":
+        return load_duckdb(df, table_name, key_cols=key_cols)
+    df = to_load_types(df)
+    changed, ledger = delta_rows(df, table_name, key_cols)
+    metrics.count(f"delta.{table_name}.unchanged_rows", len(df) - len(changed))
+
+    if not changed.empty:
+        copy_load(changed, table_name, conflict_cols=key_cols, chunksize=chunksize, max_chunk_mb=max_chunk_mb)
+        write_ledger(ledger, table_name)
+
+    print(f"✅ Loaded {len(changed)} new or changed rows into {table_name} ({len(df)} checked)")
+    return len(changed)
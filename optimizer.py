@@ -0,0 +1,158 @@
+"""
+Daily / weekly lineup optimizer.
+
+For each day of a scoring week, the roster players whose team plays that day are assigned to
+starting slots so that the total expected fantasy points is maximal. A player may fill any
+slot that one of their positions is eligible for ("Guard-Forward" -> G, F, G/F, UTIL). The
+assignment is solved exactly with the Hungarian algorithm (players x (slots + bench)),
+which takes well under a millisecond for a roster, so many rosters and what-if trades can
+be evaluated per second.
+"""
+import numpy as np
+import pandas as pd
+
+# Starting slots and how many of each
+DEFAULT_SLOTS = {"G": 2, "F": 2, "C": 1, "G/F": 1, "F/C": 1, "UTIL": 3}
+
+# Which positions may fill each slot
+SLOT_ELIGIBILITY = {
+    "G": {"G"},
+    "F": {"F"},
+    "C": {"C"},
+    "G/F": {"G", "F"},
+    "F/C": {"F", "C"},
+    "UTIL": {"G", "F", "C"},
+}
+
+POSITION_CODES = {"Guard": "G", "Forward": "F", "Center": "C"}
+
+_INELIGIBLE = 1e9
+
+
+def position_codes(position) -> frozenset:
+    """'Guard-Forward' -> {'G', 'F'}; unknown or missing positions give an empty set (UTIL only)."""
+    if not isinstance(position, str):
+        return frozenset()
+    return frozenset(POSITION_CODES[p] for p in position.split("-") if p in POSITION_CODES)
+
+
+def solve_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Minimum-cost assignment of every row to a distinct column (rows <= columns), the
+    Hungarian algorithm in its shortest-augmenting-path form. Returns the column of each row.
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError(f"solve_assignment needs rows <= columns, got a {n}x{m} cost matrix")
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j]: row (1-based) assigned to column j, 0 = none
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            reduced = np.concatenate(([np.inf], cost[i0 - 1] - u[i0] - v[1:]))
+            improve = ~used & (reduced < minv)
+            minv[improve] = reduced[improve]
+            way[improve] = j0
+            candidates = np.where(used, np.inf, minv)
+            j1 = int(np.argmin(candidates))
+            delta = candidates[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    assignment = np.empty(n, dtype=int)
+    assigned = np.nonzero(p[1:])[0]
+    assignment[p[1:][assigned] - 1] = assigned
+    return assignment
+
+
+class LineupOptimizer:
+    """Exact best lineups for slot rules such as DEFAULT_SLOTS."""
+
+    def __init__(self, slots=DEFAULT_SLOTS, slot_eligibility=SLOT_ELIGIBILITY):
+        self.slot_names = [name for name, count in slots.items() for _ in range(count)]
+        self._slot_positions = [slot_eligibility[name] for name in self.slot_names]
+        self._rows = {}  # position codes -> eligibility row over slots
+
+    def eligibility(self, codes) -> np.ndarray:
+        row = self._rows.get(codes)
+        if row is None:
+            every = set(POSITION_CODES.values())
+            row = self._rows[codes] = np.array([bool(codes & allowed) if codes else allowed == every
+                                                for allowed in self._slot_positions])
+        return row
+
+    def best_lineup(self, eligible: np.ndarray, values: np.ndarray):
+        """
+        eligible is players x slots, values the players' expected points. Returns the slot
+        index of each player (-1 = bench) and the lineup's total.
+        """
+        n, n_slots = eligible.shape
+        if n == 0:
+            return np.empty(0, dtype=int), 0.0
+        cost = np.hstack([np.where(eligible, -values[:, None], _INELIGIBLE), np.zeros((n, n))])
+        assignment = solve_assignment(cost)
+        slot = np.where(assignment < n_slots, assignment, -1)
+        return slot, float(values[slot >= 0].sum())
+
+    def _roster_arrays(self, roster, positions, expected, player_teams):
+        eligible = np.array([self.eligibility(position_codes(positions.get(pid))) for pid in roster],
+                            dtype=bool).reshape(len(roster), len(self.slot_names))
+        values = np.array([float(expected.get(pid, 0.0)) for pid in roster])
+        teams = np.array([player_teams.get(pid, -1) for pid in roster])
+        return eligible, values, teams
+
+    def optimize_week(self, roster, positions, expected, player_teams, days) -> pd.DataFrame:
+        """
+        Best lineup for every day in days (see schedule_days). positions maps player_id to a
+        ProfileStore position ('Guard-Forward'), expected to expected fantasy points per game,
+        player_teams to team_id. Returns one row per started player per day.
+        """
+        roster = list(roster)
+        eligible, values, teams = self._roster_arrays(roster, positions, expected, player_teams)
+        lineups = []
+        for game_date, playing_teams in days:
+            idx = np.nonzero(np.isin(teams, playing_teams))[0]
+            slot, _ = self.best_lineup(eligible[idx], values[idx])
+            for player, s in zip(idx[slot >= 0], slot[slot >= 0]):
+                lineups.append((game_date, self.slot_names[s], roster[player], values[player]))
+        return pd.DataFrame(lineups, columns=["game_date", "slot", "player_id", "expected_fp"])
+
+    def week_total(self, roster, positions, expected, player_teams, days) -> float:
+        """Total expected points of the week's best lineups (for comparing rosters and what-if trades)."""
+        eligible, values, teams = self._roster_arrays(list(roster), positions, expected, player_teams)
+        total = 0.0
+        for _, playing_teams in days:
+            idx = np.nonzero(np.isin(teams, playing_teams))[0]
+            total += self.best_lineup(eligible[idx], values[idx])[1]
+        return total
+
+
+def schedule_days(games_df: pd.DataFrame) -> list:
+    """[(game_date, team_ids playing that day)] from a schedule frame (game_date, team_id), e.g.
+    extract_games_by_dates for the coming week. Compute once and reuse across rosters."""
+    return [(game_date, day["team_id"].unique()) for game_date, day in games_df.groupby("game_date")]
+
+
+def optimize_roster_week(roster, games_df, expected, player_teams, profiles=None, slots=DEFAULT_SLOTS) -> pd.DataFrame:
+    """Convenience wrapper: positions from the ProfileStore, one week's schedule, default slot rules."""
+    if profiles is None:
+        from helpers.profiles import ProfileStore
+        profiles = ProfileStore()
+    positions = profiles.lookup("position", player_ids=roster)
+    return LineupOptimizer(slots).optimize_week(roster, positions, expected, player_teams, schedule_days(games_df))
@@ -0,0 +1,132 @@
+"""
+Streaming ETL for per-game player stats.
+
+Games flow through fetch -> normalize/score -> load in micro-batches. Each stage is a
+generator; `prefetch` runs a stage in a background thread behind a bounded queue, so a
+fast stage can only get `queue_size` batches ahead of a slow one (backpressure) and
+memory stays flat however many seasons are backfilled. Every batch is written to the
+SeasonStore and delta-loaded before the next one is pulled through, so a killed run
+resumes where it stopped.
+"""
+import queue
+import threading
+import pandas as pd
+from extract import extract_games_by_season, fetch_player_game_stats, game_is_final, map_games
+from transform import normalize_season_player_game_stats
+from load import load_delta
+from helpers.ratelimit import RateLimiter
+from helpers.store import SeasonStore
+from helpers.manifest import FetchManifest, OK, EMPTY, FAILED
+from helpers.metrics import metrics, timed_stage
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def prefetch(iterable, queue_size=2):
+    """Run a generator stage in a background thread, buffering at most queue_size items ahead."""
+    buffer = queue.Queue(maxsize=queue_size)
+
+    def worker():
+        try:
+            for item in iterable:
+                buffer.put(item)
+            buffer.put(_DONE)
+        except BaseException as e:
+            buffer.put(_Failure(e))
+
+    threading.Thread(target=worker, daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _Failure):
+            raise item.error
+        yield item
+
+
+def fetch_batches(game_ids, store, manifest, batch_size=50, max_workers=4, requests_per_second=1.0,
+                  game_dates=None):
+    """
+    Yield (game_ids, cached_rows, fetched, failed_ids) per micro-batch; fetched is a list of
+    (game_id, raw_df). One manifest query up front decides which games need the API.
+    game_dates (game_id -> date) decides which raw box scores are final enough to cache.
+    """
+    game_dates = game_dates or {}
+    limiter = RateLimiter(rate=requests_per_second, burst=max_workers)
+    game_ids = [str(gid).zfill(10) for gid in game_ids]
+    settled = manifest.settled(store=store)
+
+    for start in range(0, len(game_ids), batch_size):
+        batch = game_ids[start:start + batch_size]
+        cached = [gid for gid in batch if settled.get(gid) == OK]
+        missing = [gid for gid in batch if gid not in settled]
+
+        results = map_games(
+            lambda gid, lim: fetch_player_game_stats(gid, rate_limiter=lim, normalize=False,
+                                                     cacheable=game_is_final(gid, game_dates.get(gid))),
+            missing, max_workers=max_workers, rate_limiter=limiter)
+        fetched = [(gid, df) for gid, df in zip(missing, results) if df is not None]
+        failed = [gid for gid, df in zip(missing, results) if df is None]
+
+        yield batch, store.read(game_ids=cached) if cached else pd.DataFrame(), fetched, failed
+
+
+def normalize_batches(batches):
+    """Normalize and score each batch's freshly fetched box scores in one vectorized pass."""
+    for batch, cached_rows, fetched, failed in batches:
+        new_rows = normalize_season_player_game_stats([df for _, df in fetched])
+        yield batch, cached_rows, [gid for gid, _ in fetched], failed, new_rows
+
+
+def load_batches(batches, store, manifest, table_name="player_per_game_stats", game_dates=None):
+    """Persist each batch to the store and manifest, then delta-load it; yields (game_ids, rows loaded)."""
+    for batch, cached_rows, fetched_ids, failed_ids, new_rows in batches:
+        if fetched_ids:
+            store.write(new_rows, game_ids=fetched_ids, game_dates=game_dates)
+            counts = new_rows["game_id"].value_counts() if not new_rows.empty else {}
+            manifest.record_many([(gid, OK if counts.get(gid, 0) else EMPTY, counts.get(gid, 0))
+                                  for gid in fetched_ids])
+        manifest.record_many([(gid, FAILED, 0) for gid in failed_ids])
+        rows = pd.concat([cached_rows, new_rows], ignore_index=True)
+        loaded = load_delta(rows, table_name) if not rows.empty else 0
+        yield batch, loaded
+
+
+@timed_stage("pipeline")
+def run_pipeline(game_ids, store=None, manifest=None, game_dates=None, batch_size=50, queue_size=2,
+                 max_workers=4, requests_per_second=1.0, table_name="player_per_game_stats"):
+    """Stream every game through fetch -> normalize -> load; returns the number of rows loaded."""
+    store = store or SeasonStore()
+    manifest = manifest if manifest is not None else FetchManifest()
+    if not len(manifest):
+        manifest.import_store_index(store)
+
+    fetched = prefetch(fetch_batches(game_ids, store, manifest, batch_size, max_workers, requests_per_second,
+                                     game_dates), queue_size)
+    normalized = prefetch(normalize_batches(fetched), queue_size)
+
+    total = 0
+    done = 0
+    for batch, loaded in load_batches(normalized, store, manifest, table_name, game_dates):
+        total += loaded
+        done += len(batch)
+        print(f"[PIPELINE] {done}/{len(game_ids)} games processed, {total} rows loaded")
+    return total
+
+
+def main():
+    games_df = extract_games_by_season()
+    game_ids = games_df["game_id"].unique().tolist()
+    game_dates = dict(zip(games_df["game_id"], games_df["game_date"]))
+    run_pipeline(game_ids, game_dates=game_dates)
+    print("✅ Streaming ETL completed")
+    metrics.export()
+
+
+if __name__ == "__main__":
+    main()
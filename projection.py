@@ -0,0 +1,163 @@
+"""
+Monte Carlo weekly fantasy projections.
+
+Each player's per-game fantasy points are fitted from player_per_game_stats rows with
+recent games weighted more (exponential decay by half_life games), as a Gamma
+distribution (fantasy points are skewed right: occasional big games). A scoring week is
+then simulated n_sims times per player: games played ~ Binomial(team games that week,
+availability) and the week's total ~ Gamma(games played * shape, scale), the exact sum of
+that many per-game draws. Everything is batched NumPy over (players, sims) arrays;
+batches can be spread over a process pool.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from analytics import game_order
+
+PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def fit_players(per_game_df: pd.DataFrame, half_life=10.0, availability_games=20, min_games=3,
+                fp_col="fantasy_points") -> pd.DataFrame:
+    """
+    Recent-form weighted per-game fantasy distribution per player: weighted mean and std of
+    fantasy points over games played, plus availability, the share of their current team's
+    last availability_games games (since they joined it) they played in.
+    Games are ordered by analytics.game_order (by game_date when the frame has it).
+    Players with fewer than min_games are skipped.
+    """
+    cols = ["player_id", "team_id", "game_id", "minutes", fp_col]
+    df = per_game_df[cols + (["game_date"] if "game_date" in per_game_df.columns else [])].copy()
+    df["game_id"] = df["game_id"].astype(str).str.zfill(10)
+    dates = df["game_date"] if "game_date" in df.columns else pd.Series(None, index=df.index)
+    order = [game_order(gid, d if pd.notna(d) else None) for gid, d in zip(df["game_id"], dates)]
+    df = df.iloc[sorted(range(len(df)), key=order.__getitem__)]
+    df["seq"] = pd.factorize(df["game_id"])[0]  # chronological game index
+
+    played = df[df["minutes"] > 0]
+    latest_team = played.groupby("player_id")["team_id"].last()
+
+    # Availability: share of their current team's recent games (since they joined it) a player played in
+    team_games = df[["team_id", "game_id", "seq"]].drop_duplicates(["team_id", "game_id"])
+    team_games = team_games[team_games.groupby("team_id")["seq"].rank(ascending=False) <= availability_games]
+    on_team = played[played["team_id"].to_numpy() == latest_team.loc[played["player_id"]].to_numpy()]
+    joined = on_team.groupby("player_id")["seq"].min()
+    eligible = pd.DataFrame({"team_id": latest_team, "joined": joined}).reset_index().merge(team_games, on="team_id")
+    eligible = eligible[eligible["seq"] >= eligible["joined"]]
+    appeared = eligible.merge(on_team[["player_id", "game_id"]], on=["player_id", "game_id"])
+    availability = (appeared.groupby("player_id").size() / eligible.groupby("player_id").size()
+                    ).reindex(latest_team.index).fillna(0)
+
+    # Exponentially decayed weights: the newest game weighs 1, one half_life older weighs 0.5
+    age = played.groupby("player_id").cumcount(ascending=False)
+    played = played.assign(w=0.5 ** (age / half_life))
+    played["wfp"] = played["w"] * played[fp_col]
+    played["wfp2"] = played["w"] * played[fp_col] ** 2
+    sums = played.groupby("player_id")[["w", "wfp", "wfp2"]].sum()
+    mean = sums["wfp"] / sums["w"]
+    var = (sums["wfp2"] / sums["w"] - mean ** 2).clip(lower=0)
+
+    fits = pd.DataFrame({
+        "team_id": latest_team,
+        "games": played.groupby("player_id").size(),
+        "mean_fp": mean,
+        "std_fp": np.sqrt(var),
+        "availability": availability,
+    }).reset_index()
+    return fits[fits["games"] >= min_games].reset_index(drop=True)
+
+
+def games_per_week(games_df: pd.DataFrame) -> pd.DataFrame:
+    """Games per team per scoring week (weeks start on Monday) from an extract_games_by_season-style frame."""
+    dates = pd.to_datetime(games_df["game_date"])
+    week_start = (dates - pd.to_timedelta(dates.dt.weekday, unit="D")).dt.date
+    counts = games_df.assign(week_start=week_start).drop_duplicates(["team_id", "game_id"])
+    return counts.groupby(["team_id", "week_start"]).size().rename("team_games").reset_index()
+
+
+def _simulate_batch(args):
+    """Simulate one batch of players; returns one row of summary stats per player."""
+    mean, std, availability, team_games, n_sims, seed, boom, bust = args
+    rng = np.random.default_rng(seed)
+    n = len(mean)
+
+    played = rng.binomial(team_games[:, None], availability[:, None], size=(n, n_sims))
+    gamma_ok = (mean > 0) & (std > 0)
+    shape = np.where(gamma_ok, (mean / np.where(std > 0, std, 1)) ** 2, 1.0)
+    scale = np.where(gamma_ok, std ** 2 / np.where(mean > 0, mean, 1), 0.0)
+
+    totals = np.zeros((n, n_sims))
+    draw = played > 0
+    rows = np.nonzero(draw)[0]
+    totals[draw] = rng.gamma(played[draw] * shape[rows], scale[rows])
+    # Degenerate fits (no spread, or a non-positive mean) just score their mean every game
+    totals = np.where(gamma_ok[:, None], totals, played * mean[:, None])
+
+    # Boom / bust are undefined without an expected week (no games, availability or points)
+    expected = (mean * availability * team_games)[:, None]
+    has_week = expected[:, 0] > 0
+    return np.column_stack([
+        totals.mean(axis=1),
+        totals.std(axis=1),
+        np.percentile(totals, PERCENTILES, axis=1).T,
+        np.where(has_week, (totals >= boom * expected).mean(axis=1), np.nan),
+        np.where(has_week, (totals <= bust * expected).mean(axis=1), np.nan),
+    ])
+
+
+def simulate_weeks(fits: pd.DataFrame, team_games, n_sims=20000, seed=0, processes=None, batch_size=64,
+                   boom=1.3, bust=0.7) -> pd.DataFrame:
+    """
+    Simulate one scoring week n_sims times for every fitted player. team_games maps team_id
+    to the team's games that week (e.g. one week of games_per_week). Boom / bust are the
+    chances of scoring at least boom x, or at most bust x, the player's expected week
+    (NaN when that expectation is 0, e.g. the team has no games).
+    Results don't depend on processes: every batch has its own seed.
+    """
+    team_games = pd.Series(team_games) if not isinstance(team_games, pd.Series) else team_games
+    games = fits["team_id"].map(team_games).fillna(0).astype(int).to_numpy()
+    mean = fits["mean_fp"].to_numpy(float)
+    std = fits["std_fp"].to_numpy(float)
+    availability = fits["availability"].to_numpy(float)
+
+    starts = range(0, len(fits), batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    batches = [(mean[s:s + batch_size], std[s:s + batch_size], availability[s:s + batch_size],
+                games[s:s + batch_size], n_sims, seq, boom, bust) for s, seq in zip(starts, seeds)]
+
+    if processes and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_simulate_batch, batches))
+    else:
+        results = [_simulate_batch(batch) for batch in batches]
+
+    columns = ["mean", "std"] + [f"p{p}" for p in PERCENTILES] + ["boom_prob", "bust_prob"]
+    stats = pd.DataFrame(np.vstack(results) if results else np.empty((0, len(columns))), columns=columns)
+    projection = pd.concat([fits[["player_id", "team_id"]].reset_index(drop=True), stats], axis=1)
+    projection.insert(2, "team_games", games)
+    return projection.sort_values("mean", ascending=False).reset_index(drop=True)
+
+
+def project_week(per_game_df, games_df, week_start, **kwargs) -> pd.DataFrame:
+    """Fit players on per_game_df and simulate the scoring week starting on week_start (a Monday)."""
+    fits = fit_players(per_game_df)
+    weeks = games_per_week(games_df)
+    week = weeks[weeks["week_start"] == pd.Timestamp(week_start).date()]
+    return simulate_weeks(fits, week.set_index("team_id")["team_games"], **kwargs)
+
+
+def main():
+    from datetime import date, timedelta
+    from config import CURRENT_SEASON
+    from extract import extract_games_by_dates
+    from helpers.store import SeasonStore
+
+    today = date.today()
+    week_start = today + timedelta(days=7 - today.weekday())
+    upcoming = extract_games_by_dates(str(week_start), str(week_start + timedelta(days=6)))
+    projection = project_week(SeasonStore().read(season=CURRENT_SEASON), upcoming, week_start, processes=4)
+    print(projection.head(25).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Stage-selectable ETL runner.
+
+The ETL is a DAG of stages (extract -> transform -> load). Every stage persists its output
+as an artifact under artifacts/ together with a fingerprint of its inputs (stage version,
+season and the content hashes of the upstream outputs), so a stage whose fingerprint
+matches and whose artifact hasn't outlived its TTL is skipped. Heavy modules (pandas,
+nba_api, SQLAlchemy, config.engine) are only imported by stages that actually run.
+
+    python runner.py --list
+    python runner.py load_player_game_stats             # and whatever it depends on
+    python runner.py players --season 2023-24 --force players
+    python runner.py --dry-run
+"""
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import time
+from helpers.metrics import metrics
+
+ARTIFACT_DIR = "artifacts"
+HOUR = 3600
+
+
+def current_season(today=None) -> str:
+    """Season in progress on a date, e.g. 2025-03-01 -> '2024-25' (seasons start in October)."""
+    today = today or datetime.date.today()
+    start = today.year if today.month >= 10 else today.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+class Stage:
+    """
+    One node of the DAG. fn(season, *upstream_outputs) returns a DataFrame artifact, or a
+    row count for load stages (which only keep a marker). Bump version when fn's output changes.
+    """
+
+    def __init__(self, name, fn, deps=(), ttl=None, version=1, load=False):
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.ttl = ttl
+        self.version = version
+        self.load = load
+
+
+# --- Stage bodies (imports are local so a skipped stage costs nothing) ---
+
+def _player_stats(season):
+    from extract import extract_player_stats
+    return extract_player_stats(season)
+
+
+def _teams(season):
+    from transform import transform_teams
+    return transform_teams()
+
+
+def _players(season, player_stats):
+    from extract import get_player_profiles
+    from transform import transform_players, deduplicate_players
+
+    profiles = get_player_profiles(player_stats["PLAYER_ID"].unique().tolist())
+    players_df = transform_players(player_stats)
+    for field in ("position", "height", "weight"):
+        players_df[field] = players_df["player_id"].map(profiles.lookup(field))
+    return deduplicate_players(players_df)
+
+
+def _player_season_stats(season, player_stats):
+    from transform import transform_player_stats, aggregate_player_game_stats
+    return aggregate_player_game_stats(transform_player_stats(player_stats, season))
+
+
+def _games(season):
+    from extract import extract_games_by_season
+    return extract_games_by_season(season)
+
+
+def _player_game_stats(season, games):
+    from extract import extract_player_game_stats_bulk
+    from helpers.store import SeasonStore
+    return extract_player_game_stats_bulk(games, season=season, store=SeasonStore(), max_workers=4)
+
+
+def _loader(table_name, **kwargs):
+    def load(season, df):
+        from load import load_table
+        load_table(df, table_name, **kwargs)
+        return len(df)
+    return load
+
+
+STAGES = [
+    Stage("player_stats", _player_stats, ttl=12 * HOUR),
+    Stage("teams", _teams),
+    Stage("players", _players, deps=["player_stats"]),
+    Stage("player_season_stats", _player_season_stats, deps=["player_stats"]),
+    Stage("games", _games, ttl=6 * HOUR),
+    Stage("player_game_stats", _player_game_stats, deps=["games"], ttl=6 * HOUR),
+    Stage("load_teams", _loader("team"), deps=["teams"], load=True),
+    Stage("load_players", _loader("player"), deps=["players"], load=True),
+    Stage("load_player_season_stats", _loader("player_game_stats"), deps=["player_season_stats"], load=True),
+    Stage("load_games", _loader("games"), deps=["games"], load=True),
+    Stage("load_player_game_stats", _loader("player_per_game_stats", delta=True),
+          deps=["player_game_stats"], load=True),
+]
+
+
+class Runner:
+    def __init__(self, stages=STAGES, season=None, artifact_dir=ARTIFACT_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.season = season or current_season()
+        self.artifact_dir = os.path.join(artifact_dir, self.season)
+        self._outputs = {}
+
+    def _meta_file(self, name):
+        return os.path.join(self.artifact_dir, f"{name}.json")
+
+    def _data_file(self, name):
+        return os.path.join(self.artifact_dir, f"{name}.parquet")
+
+    def meta(self, name):
+        if os.path.exists(self._meta_file(name)):
+            with open(self._meta_file(name), "r") as f:
+                return json.load(f)
+        return None
+
+    def plan(self, targets=None) -> list:
+        """Targets and their dependencies in topological order (every stage when targets is empty)."""
+        order, seen = [], set()
+
+        def visit(name):
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage {name!r}; see --list")
+            if name in seen:
+                return
+            seen.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            order.append(name)
+
+        for name in targets or self.stages:
+            visit(name)
+        return order
+
+    def fingerprint(self, name) -> str:
+        """Hash of what the stage's output depends on; upstream outputs count by content hash."""
+        stage = self.stages[name]
+        parts = [name, stage.version, self.season]
+        for dep in stage.deps:
+            meta = self.meta(dep)
+            parts.append(meta["output_hash"] if meta else None)
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def is_fresh(self, name) -> bool:
+        stage, meta = self.stages[name], self.meta(name)
+        if meta is None or meta["fingerprint"] != self.fingerprint(name):
+            return False
+        if stage.ttl is not None and time.time() - meta["created_at"] > stage.ttl:
+            return False
+        return stage.load or os.path.exists(self._data_file(name))
+
+    def output(self, name):
+        """A stage's artifact, read from disk on first use."""
+        if name not in self._outputs:
+            import pandas as pd
+            self._outputs[name] = pd.read_parquet(self._data_file(name))
+        return self._outputs[name]
+
+    def run_stage(self, name):
+        stage = self.stages[name]
+        fingerprint = self.fingerprint(name)
+        with metrics.stage(f"runner.{name}"):
+            result = stage.fn(self.season, *(self.output(dep) for dep in stage.deps))
+
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        if stage.load:
+            output_hash = fingerprint
+        else:
+            import pandas as pd
+            tmp_file = self._data_file(name) + ".tmp"
+            result.to_parquet(tmp_file, index=False)
+            os.replace(tmp_file, self._data_file(name))
+            output_hash = hashlib.sha256(pd.util.hash_pandas_object(result, index=False).values.tobytes()).hexdigest()
+            self._outputs[name] = result
+
+        meta = {"fingerprint": fingerprint, "output_hash": output_hash, "created_at": time.time(),
+                "rows": int(result) if stage.load else len(result)}
+        with open(self._meta_file(name), "w") as f:
+            json.dump(meta, f)
+
+    def out_of_date(self, name, force=(), upstream=()) -> bool:
+        """
+        Whether a stage has to run. A stage below one that runs (upstream) counts as out of
+        date: its fingerprint can't be known until the upstream output has been rehashed.
+        """
+        if name in force or any(dep in upstream for dep in self.stages[name].deps):
+            return True
+        return not self.is_fresh(name)
+
+    def run(self, targets=None, force=(), dry_run=False) -> list:
+        """Run the targets' out-of-date stages in dependency order; returns the stages that ran."""
+        ran = []
+        for name in self.plan(targets):
+            # A real run rehashes upstream outputs first, so an unchanged artifact still skips
+            if not self.out_of_date(name, force, upstream=ran if dry_run else ()):
+                print(f"[RUNNER] {name}: up to date")
+                continue
+            print(f"[RUNNER] {name}: {'would run' if dry_run else 'running'}")
+            if not dry_run:
+                self.run_stage(name)
+            ran.append(name)
+        return ran
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--season", help="season such as 2024-25 (default: the season in progress)")
+    parser.add_argument("--force", nargs="*", metavar="STAGE",
+                        help="re-run these stages even if up to date (no names: every planned stage)")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would run")
+    parser.add_argument("--list", action="store_true", help="list stages and their status")
+    args = parser.parse_args(argv)
+
+    runner = Runner(season=args.season)
+    if args.list:
+        stale = []
+        for name in runner.plan():
+            stage = runner.stages[name]
+            if runner.out_of_date(name, upstream=stale):
+                stale.append(name)
+            status = "stale" if name in stale else "up to date"
+            deps = f" <- {', '.join(stage.deps)}" if stage.deps else ""
+            print(f"{name:<26} {status:<11}{deps}")
+        return
+
+    force = runner.plan(args.targets) if args.force == [] else args.force or []
+    ran = runner.run(args.targets, force=set(force), dry_run=args.dry_run)
+    if ran and not args.dry_run:
+        print("✅ ETL completed")
+        metrics.export()
+
+
+if __name__ == "__main__":
+    main()
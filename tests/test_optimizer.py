@@ -0,0 +1,47 @@
+import itertools
+import numpy as np
+import pytest
+from optimizer import LineupOptimizer, solve_assignment
+
+
+def brute_force_cost(cost):
+    n, m = cost.shape
+    return min(cost[np.arange(n), list(cols)].sum() for cols in itertools.permutations(range(m), n))
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_solve_assignment_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 6))
+    cost = rng.integers(-20, 20, size=(n, n + int(rng.integers(0, 3)))).astype(float)
+
+    assignment = solve_assignment(cost)
+
+    assert len(set(assignment)) == n
+    assert cost[np.arange(n), assignment].sum() == brute_force_cost(cost)
+
+
+def test_solve_assignment_rejects_more_rows_than_columns():
+    with pytest.raises(ValueError):
+        solve_assignment(np.zeros((13, 10)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_best_lineup_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    optimizer = LineupOptimizer(slots={"G": 1, "F": 1, "UTIL": 1})
+    n = int(rng.integers(1, 6))
+    eligible = rng.random((n, 3)) < 0.6
+    eligible[:, 2] = True  # UTIL takes anyone
+    values = rng.random(n) * 50
+
+    slot, total = optimizer.best_lineup(eligible, values)
+
+    best = 0.0
+    for slots in itertools.product(range(-1, 3), repeat=n):
+        started = [s for s in slots if s >= 0]
+        if len(started) == len(set(started)) and all(s < 0 or eligible[i, s] for i, s in enumerate(slots)):
+            best = max(best, sum(values[i] for i, s in enumerate(slots) if s >= 0))
+    assert total == pytest.approx(best)
+    assert all(s < 0 or eligible[i, s] for i, s in enumerate(slot))
+    assert len(set(slot[slot >= 0])) == (slot >= 0).sum()
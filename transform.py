@@ -1,7 +1,11 @@
 import pandas as pd
-from nba_api.stats.static import teams as static_teams
 import os
-from helpers.convertMinutesToFloat import convert_minutes_to_float
+from helpers.convertMinutesToFloat import convert_minutes_column
+from helpers.calculateFantasyPoints import score_rulesets
+from helpers.weights import LEAGUES, DEFAULT_LEAGUE
+from helpers.metrics import timed_stage
+from helpers.season_totals import SeasonTotals, SEASON_SUM_COLS
+from helpers.store import season_from_game_id
 
 def transform_teams(cache_file="teams_static.csv"):
     """Transform NBA static teams data for Postgres."""
@@ -10,6 +14,8 @@ def transform_teams(cache_file="teams_static.csv"):
         print(f"✅ Loaded team static data from {cache_file}")
         return teams_df
     else:
+        from nba_api.stats.static import teams as static_teams
+
         all_teams = pd.DataFrame(static_teams.get_teams())
         all_teams = all_teams.rename(columns={
             "id": "team_id",
@@ -52,6 +58,7 @@ def transform_players(df):
 
     return player_stats[['player_id', 'first_name', 'last_name', 'position', 'team_id', 'height', 'weight']]
 
+@timed_stage("transform.player_stats")
 def transform_player_stats(df_raw: pd.DataFrame, season: str) -> pd.DataFrame:
     """Transform raw NBA stats dataframe to match Postgres schema for player_game_stats."""
 
@@ -83,7 +90,7 @@ def transform_player_stats(df_raw: pd.DataFrame, season: str) -> pd.DataFrame:
     }
 
     df = df_raw[list(column_mapping.keys())].rename(columns=column_mapping)
-    df["minutes"] = df["minutes"].apply(convert_minutes_to_float)
+    df["minutes"] = convert_minutes_column(df["minutes"])
 
     # Ensure correct data types (important for Postgres load)
     int_cols = [
@@ -101,25 +108,105 @@ def transform_player_stats(df_raw: pd.DataFrame, season: str) -> pd.DataFrame:
 
     return df
 
+@timed_stage("transform.aggregate")
 def aggregate_player_game_stats(df):
     # --- Aggregate player_game_stats across teams per season ---
-    sum_cols = [
-        "games_played", "minutes", "points", "defensive_rebounds", "offensive_rebounds",
-        "total_rebounds", "assists", "steals", "blocks", "turnovers",
-        "fga", "fgm", "three_pta", "three_ptm", "fta", "ftm", "fouls",
-        "fantasy_points"
-    ]
-
     # Group by player and season, sum counting stats
-    df_agg = df.groupby(["player_id", "season"], as_index=False)[sum_cols].sum()
+    df_agg = df.groupby(["player_id", "season"], as_index=False)[SEASON_SUM_COLS].sum()
 
     # Recompute percentages correctly
+    return add_shooting_percentages(df_agg)
+
+
+def add_shooting_percentages(df_agg):
+    """fg/ft/3pt percentages from made and attempted totals (0 when nothing was attempted)."""
     df_agg["fg_pct"] = (df_agg["fgm"] / df_agg["fga"]).fillna(0).round(2)
     df_agg["ft_pct"] = (df_agg["ftm"] / df_agg["fta"]).fillna(0).round(2)
     df_agg["three_pct"] = (df_agg["three_ptm"] / df_agg["three_pta"]).fillna(0).round(2)
-
     return df_agg
 
+
+@timed_stage("transform.update_season_totals")
+def update_season_totals(per_game_df: pd.DataFrame, totals=None, store=None) -> pd.DataFrame:
+    """
+    Incremental aggregate_player_game_stats: add normalized per-game rows to the persisted
+    SeasonTotals (games already applied are ignored) and return the refreshed season rows
+    of just the players they touched, with percentages derived from the running totals.
+    Work is proportional to the new rows, not to the season.
+    A season that was never seeded (SeasonTotals.rebuild) is rebuilt from store first;
+    without a store its rows are skipped, since one night of games is not a season total.
+    """
+    totals = totals if totals is not None else SeasonTotals()
+    empty = pd.DataFrame(columns=["player_id", "season", "team_id"] + SEASON_SUM_COLS)
+    if per_game_df.empty:
+        return empty
+    per_game_df = to_load_types(per_game_df)
+    seasons = per_game_df["game_id"].map(season_from_game_id)
+    parts, rebuilt = [], []
+    for season, part in per_game_df.groupby(seasons):
+        if not totals.is_seeded(season):
+            if store is None:
+                print(f"[TOTALS] {season} season totals were never seeded; skipping (run SeasonTotals.rebuild)")
+                continue
+            totals.rebuild(store, season)
+            # The rebuild already counted these games, so apply() won't report their players
+            rebuilt.append(pd.DataFrame({"player_id": part["player_id"].astype(int).unique(), "season": season}))
+        parts.append(season_rows_from_games(part, season))
+    if not parts:
+        return empty
+    changed = totals.apply(pd.concat(parts, ignore_index=True))
+    df_agg = totals.read(keys=pd.concat([changed] + rebuilt, ignore_index=True))
+    df_agg = df_agg.astype({col: int for col in SEASON_SUM_COLS if col not in ("minutes", "fantasy_points")})
+    return add_shooting_percentages(df_agg)
+
+# player_per_game_stats column -> player_game_stats (season totals) column
+PER_GAME_TO_SEASON_COLS = {
+    "minutes": "minutes",
+    "pts": "points",
+    "dreb": "defensive_rebounds",
+    "oreb": "offensive_rebounds",
+    "reb": "total_rebounds",
+    "ast": "assists",
+    "stl": "steals",
+    "blk": "blocks",
+    "turnovers": "turnovers",
+    "fga": "fga",
+    "fgm": "fgm",
+    "fg3a": "three_pta",
+    "fg3m": "three_ptm",
+    "fta": "fta",
+    "ftm": "ftm",
+    "pf": "fouls",
+}
+
+
+def season_rows_from_games(df: pd.DataFrame, season: str) -> pd.DataFrame:
+    """
+    Per-game rows in the player_game_stats layout (one game played per row with minutes)
+    plus game_id, ready for aggregate_player_game_stats or update_season_totals.
+    fantasy_points are rescored with the NBA's formula, so they add up to the NBA_FANTASY_PTS
+    that transform_player_stats loads into the same column (our league's score stays per game).
+    """
+    rows = df[["player_id", "team_id"] + list(PER_GAME_TO_SEASON_COLS)].rename(columns=PER_GAME_TO_SEASON_COLS)
+    rows.insert(2, "games_played", (df["minutes"] > 0).astype(int))
+    rows["fantasy_points"] = compute_fantasy_points(df, league="nba").to_numpy()
+    rows["game_id"] = df["game_id"]
+    rows["season"] = season
+    return rows
+
+
+def season_totals_from_games(df: pd.DataFrame, season: str) -> pd.DataFrame:
+    """
+    A whole season's player_game_stats rows from its per-game rows in one pass (the batch
+    counterpart of update_season_totals, for backfills); team_id is each player's latest team.
+    """
+    rows = season_rows_from_games(to_load_types(df), season)
+    df_agg = aggregate_player_game_stats(rows)
+    latest_team = rows.sort_values("game_id").groupby("player_id")["team_id"].last()
+    df_agg.insert(2, "team_id", df_agg["player_id"].map(latest_team))
+    return df_agg.astype({col: int for col in SEASON_SUM_COLS if col not in ("minutes", "fantasy_points")})
+
+
 def deduplicate_players(df):
     df.drop_duplicates(subset="player_id", inplace=True)
     return df
@@ -157,97 +244,211 @@ def normalize_games_df(games_df: pd.DataFrame) -> pd.DataFrame:
 
     return normalized
 
+BOX_SCORE_COLUMNS = {
+    "PLAYER_ID": "player_id",
+    "GAME_ID": "game_id",
+    "TEAM_ID": "team_id",
+    "MIN": "minutes",
+    "FGM": "fgm",
+    "FGA": "fga",
+    "FG_PCT": "fg_pct",
+    "FG3M": "fg3m",
+    "FG3A": "fg3a",
+    "FG3_PCT": "fg3_pct",
+    "FTM": "ftm",
+    "FTA": "fta",
+    "FT_PCT": "ft_pct",
+    "OREB": "oreb",
+    "DREB": "dreb",
+    "REB": "reb",
+    "AST": "ast",
+    "STL": "stl",
+    "BLK": "blk",
+    "TO": "turnovers",
+    "PF": "pf",
+    "PTS": "pts",
+    "PLUS_MINUS": "plus_minus"
+}
+
+PLAYER_GAME_NUMERIC_COLS = ["fgm","fga","fg_pct","fg3m","fg3a","fg3_pct","ftm","fta","ft_pct",
+                            "oreb","dreb","reb","ast","stl","blk","turnovers","pf","pts","plus_minus"]
+
+PLAYER_GAME_SCHEMA_COLS = ["player_id", "game_id", "team_id", "minutes"] + PLAYER_GAME_NUMERIC_COLS + ["fantasy_points"]
+
+# Compact in-memory layout for season / multi-season frames (see to_compact).
+# Box-score counts fit int8; points need int16 (a 100-point game would overflow int8).
+COMPACT_INT8_COLS = ["fgm", "fga", "fg3m", "fg3a", "ftm", "fta", "oreb", "dreb", "reb",
+                     "ast", "stl", "blk", "turnovers", "pf", "plus_minus"]
+COMPACT_DTYPES = {
+    "player_id": "int32",
+    "game_id": "int32",  # "0022400077" -> 22400077
+    "team_id": "category",
+    "season_id": "category",
+    "season": "category",
+    "minutes": "float32",
+    "pts": "int16",
+    "fg_pct": "float32",
+    "fg3_pct": "float32",
+    "ft_pct": "float32",
+    "fantasy_points": "float32",
+    **{col: "int8" for col in COMPACT_INT8_COLS},
+}
+# float32 holds ~7 significant digits; stats never carry more than 4 decimals
+LOAD_FLOAT_DECIMALS = 4
+
+
+def is_compact(df: pd.DataFrame) -> bool:
+    """True if df uses the compact layout (integer game ids)."""
+    return "game_id" in df.columns and pd.api.types.is_integer_dtype(df["game_id"])
+
+
+def to_compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a normalized stats or games frame for in-memory analysis: small ints, float32
+    stats, categorical team/season ids and integer game ids. game_team_id is dropped since
+    it is just game_id + team_id; to_load_types rebuilds it.
+    """
+    if is_compact(df):
+        return df
+    df = df.drop(columns=["game_team_id"]) if {"game_team_id", "game_id", "team_id"}.issubset(df.columns) else df
+    df = df.assign(**{col: pd.to_numeric(df[col]) for col in ("game_id",) if col in df.columns})
+    return df.astype({col: dtype for col, dtype in COMPACT_DTYPES.items() if col in df.columns})
+
+
+def to_load_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Undo to_compact at the load boundary: zero-padded string game ids, game_team_id, int64/float64 columns."""
+    if not is_compact(df):
+        return df
+    df = df.copy()
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(dtype.categories.dtype)
+        elif pd.api.types.is_integer_dtype(dtype):
+            df[col] = df[col].astype("int64")
+        elif pd.api.types.is_float_dtype(dtype):
+            df[col] = df[col].astype("float64").round(LOAD_FLOAT_DECIMALS)
+    df["game_id"] = df["game_id"].astype(str).str.zfill(10)
+    if "team_id" in df.columns and "game_team_id" not in df.columns:
+        df["game_team_id"] = df["game_id"] + "_" + df["team_id"].astype(str)
+    return df
+
+
+def concat_compact(frames) -> pd.DataFrame:
+    """Concatenate compact frames (e.g. one per season) without categoricals falling back to object."""
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    categorical = [col for col, dtype in frames[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    for col in categorical:
+        categories = pd.api.types.union_categoricals([f[col] for f in frames]).categories
+        frames = [f.assign(**{col: f[col].cat.set_categories(categories)}) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_compact_seasons(store, seasons=None) -> pd.DataFrame:
+    """Read seasons from a SeasonStore one at a time, compacting each before the next is read."""
+    if seasons is None:
+        seasons = sorted({entry["season"] for entry in store.index().values() if entry["rows"]})
+    return concat_compact([to_compact(store.read(season=season)) for season in seasons])
+
+
+def is_normalized_player_game_stats(df: pd.DataFrame) -> bool:
+    """True if df already has the normalized schema (e.g. it came from our own cache)."""
+    return ("game_team_id" in df.columns
+            and set(PLAYER_GAME_SCHEMA_COLS).issubset(df.columns)
+            and pd.api.types.is_numeric_dtype(df["minutes"]))
+
 def normalize_player_game_stats(raw_df: pd.DataFrame) -> pd.DataFrame:
     """Normalize raw boxscore dataframe to match player_game_stats schema
-    and compute fantasy points:"""
+    and compute fantasy points. Every step is a whole-column operation, so pass
+    a season's worth of concatenated box scores at once rather than game by game."""
 
-    df = raw_df.copy()
+    if is_normalized_player_game_stats(raw_df):
+        return raw_df
 
     # Rename columns to match schema
-    df.rename(columns={
-        "PLAYER_ID": "player_id",
-        "GAME_ID": "game_id",
-        "TEAM_ID": "team_id",
-        "MIN": "minutes",
-        "FGM": "fgm",
-        "FGA": "fga",
-        "FG_PCT": "fg_pct",
-        "FG3M": "fg3m",
-        "FG3A": "fg3a",
-        "FG3_PCT": "fg3_pct",
-        "FTM": "ftm",
-        "FTA": "fta",
-        "FT_PCT": "ft_pct",
-        "OREB": "oreb",
-        "DREB": "dreb",
-        "REB": "reb",
-        "AST": "ast",
-        "STL": "stl",
-        "BLK": "blk",
-        "TO": "turnovers",
-        "PF": "pf",
-        "PTS": "pts",
-        "PLUS_MINUS": "plus_minus"
-    }, inplace=True)
+    df = raw_df.rename(columns=BOX_SCORE_COLUMNS)
 
-    df["minutes"] = df["minutes"].apply(convert_minutes_to_float)
+    df["minutes"] = convert_minutes_column(df["minutes"])
 
-    # Fill missing numeric values with 0
-    numeric_cols = ["fgm","fga","fg_pct","fg3m","fg3a","fg3_pct","ftm","fta","ft_pct",
-                    "oreb","dreb","reb","ast","stl","blk","turnovers","pf","pts","plus_minus"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    # Fill missing numeric values with 0 (only columns that didn't arrive numeric need parsing)
+    numeric = df[PLAYER_GAME_NUMERIC_COLS]
+    to_parse = [col for col, dtype in numeric.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+    if to_parse:
+        numeric = numeric.assign(**{col: pd.to_numeric(numeric[col], errors="coerce") for col in to_parse})
+    df[PLAYER_GAME_NUMERIC_COLS] = numeric.fillna(0)
 
     # Compute fantasy points
     df["fantasy_points"] = compute_fantasy_points(df)
 
     # Keep only columns in schema
-    schema_cols = ["player_id", "game_id", "team_id", "minutes", "fgm","fga","fg_pct","fg3m","fg3a",
-                   "fg3_pct","ftm","fta","ft_pct","oreb","dreb","reb","ast","stl","blk",
-                   "turnovers","pf","pts","plus_minus","fantasy_points"]
-
-    df = df[schema_cols]
+    df = df[PLAYER_GAME_SCHEMA_COLS].copy()
     df["game_id"] = df["game_id"].astype(str).str.zfill(10)
     df["game_team_id"] = df["game_id"] + "_" + df["team_id"].astype(str)
 
     return df
 
-def compute_fantasy_points(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute fantasy points for each row in the DataFrame based on custom league scoring."""
-
-    # Calculate misses
-    fgmi = df["fga"] - df["fgm"]
-    ftmi = df["fta"] - df["ftm"]
-    fg3mi = df["fg3a"] - df["fg3m"]
-
-    # Base fantasy score
-    points = (
-        1.0 * df["pts"]
-        + 1.0 * df["dreb"]
-        + 1.1 * df["oreb"]
-        + 1.25 * df["ast"]
-        + 1.25 * df["stl"]
-        + 1.25 * df["blk"]
-        + 0.75 * df["fgm"]
-        + 1.15 * df["fg3m"]
-        + 0.85 * df["ftm"]
-        - 0.55 * fgmi
-        - 0.65 * fg3mi
-        - 1.0 * ftmi
-        - 1.25 * df["turnovers"]
-        - 1.0 * df["pf"]
-    )
-
-    # Double/Triple/Quadruple doubles (pts, reb, ast, stl, blk)
-    reb = df["oreb"] + df["dreb"]
-    categories = ["pts", "ast", "stl", "blk"]
-    double_stats_count = df[categories].ge(10).sum(axis=1) + (reb >= 10)
-
-    # Add bonuses
-    points += (
-        5 * (double_stats_count >= 2)
-        + 10 * (double_stats_count >= 3)
-        + 600 * (double_stats_count >= 4)
-    )
-
-    return points
\ No newline at end of file
+@timed_stage("transform.normalize_season")
+def normalize_season_player_game_stats(frames) -> pd.DataFrame:
+    """Normalize many games' box scores in one batch: already-normalized frames are kept
+    as they are, raw ones are concatenated and normalized in a single vectorized pass."""
+    frames = [f for f in frames if f is not None and not f.empty]
+    done = [f for f in frames if is_normalized_player_game_stats(f)]
+    raw = [f for f in frames if not is_normalized_player_game_stats(f)]
+
+    if raw:
+        done.append(normalize_player_game_stats(pd.concat(raw, ignore_index=True)))
+    if not done:
+        return pd.DataFrame()
+    return pd.concat(done, ignore_index=True)
+
+def normalize_player_game_log(log_df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize PlayerGameLogs rows (decimal MIN, TOV instead of TO) into the player_game_stats schema.
+    Unlike box scores, game logs have no rows for players who did not play."""
+    return normalize_player_game_stats(log_df.rename(columns={"TOV": "TO"}))
+
+
+def reconcile_player_game_logs(rows: pd.DataFrame, game_ids, min_team_minutes=239.0) -> list:
+    """
+    Game ids whose bulk game-log rows can't be trusted and need a per-game box score instead:
+    games with no rows, games without exactly two teams, teams whose player minutes don't add
+    up to a full game, or rows where points don't match made shots.
+    """
+    game_ids = [str(gid).zfill(10) for gid in game_ids]
+    if rows.empty:
+        return game_ids
+
+    teams = rows.groupby(["game_id", "team_id"])["minutes"].sum().reset_index()
+    team_count = teams.groupby("game_id")["team_id"].size()
+    short_minutes = set(teams.loc[teams["minutes"] < min_team_minutes, "game_id"])
+    bad_points = set(rows.loc[rows["pts"] != 2 * rows["fgm"] + rows["fg3m"] + rows["ftm"], "game_id"])
+    complete = set(team_count[team_count == 2].index) - short_minutes - bad_points
+    return [gid for gid in game_ids if gid not in complete]
+
+
+def compute_fantasy_points(df: pd.DataFrame, league=DEFAULT_LEAGUE) -> pd.Series:
+    """Compute fantasy points for each row in the DataFrame based on one league's scoring (helpers/weights.py)."""
+    return score_rulesets(df, {league: LEAGUES[league]}).iloc[:, 0]
+
+@timed_stage("transform.rescore")
+def rescore_player_game_stats(df: pd.DataFrame, rulesets=None) -> pd.DataFrame:
+    """Add a fantasy_points_<league> column per ruleset to already-normalized per-game stats."""
+    return df.join(score_rulesets(df, rulesets))
+
+
+def normalize_game_log_df(log_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize a team-mode LeagueGameLog (one row per team per game) into the same
+    format as normalize_games_df. SEASON_ID '22024' becomes season_id '2024', like
+    the SEASON column of ScoreboardV2's GameHeader.
+    """
+    normalized = pd.DataFrame({
+        "game_id": log_df["GAME_ID"].astype(str).str.zfill(10),
+        "game_date": pd.to_datetime(log_df["GAME_DATE"]).dt.date,
+        "season_id": log_df["SEASON_ID"].astype(str).str[-4:],
+        "team_id": log_df["TEAM_ID"].astype(int),
+    })
+    normalized["game_team_id"] = normalized["game_id"] + "_" + normalized["team_id"].astype(str)
+    normalized = normalized.drop_duplicates("game_team_id").sort_values(["game_date", "game_id", "team_id"])
+    return normalized[["game_team_id", "game_id", "game_date", "season_id", "team_id"]].reset_index(drop=True)